@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""Benchmarks of the core sources, pipelines and values."""
+
+import uasyncio
+import utime
+
+from harness import measure, percentiles, report
+
+from ultimo.core import APipeline, ASource
+from ultimo.pipelines import Dedup
+from ultimo.poll import Poll
+from ultimo.value import Value
+
+ITEMS = 1000
+
+
+class CountSource(ASource):
+    """Source which counts down to zero without waiting."""
+
+    def __init__(self, count, divisor=1):
+        self.count = count
+        self.divisor = divisor
+
+    async def __call__(self):
+        value = self.count
+        self.count -= 1
+        if value < 0:
+            return None
+        else:
+            return value // self.divisor + 1
+
+
+class Increment(APipeline):
+
+    async def process(self, value):
+        return value + 1
+
+
+async def consume(source):
+    count = 0
+    async for value in source:
+        count += 1
+    return count
+
+
+def bench_source():
+    measure("source_iteration", ITEMS, consume(CountSource(ITEMS - 1)))
+
+
+def bench_pipeline(stages):
+    source = CountSource(ITEMS - 1)
+    for i in range(stages):
+        source = Increment(source=source)
+    measure("pipeline_{}_stages".format(stages), ITEMS, consume(source), stages=stages)
+
+
+def bench_dedup():
+    source = Dedup(source=CountSource(ITEMS - 1, divisor=10))
+    measure("dedup", ITEMS, consume(source))
+
+
+def bench_value_fanout(iterators=20, updates=100):
+    value = Value(0)
+
+    async def watch():
+        async for _ in value:
+            pass
+
+    async def main():
+        tasks = [uasyncio.create_task(watch()) for i in range(iterators)]
+        await uasyncio.sleep(0)
+        for i in range(1, updates + 1):
+            await value.update(i)
+            await uasyncio.sleep(0)
+        for task in tasks:
+            task.cancel()
+
+    measure("value_fanout", iterators * updates, main(), iterators=iterators)
+
+
+def bench_poll_jitter(interval=0.005, samples=200, fixed_rate=False):
+    times = []
+
+    async def sample():
+        times.append(utime.ticks_us())
+        return True
+
+    async def main():
+        flow = Poll(sample, interval, fixed_rate=fixed_rate).__aiter__()
+        for i in range(samples + 1):
+            await flow.__anext__()
+
+    start = utime.ticks_us()
+    uasyncio.run(main())
+    elapsed = utime.ticks_diff(utime.ticks_us(), start)
+    nominal = int(interval * 1000000)
+    jitter = [
+        abs(utime.ticks_diff(times[i + 1], times[i]) - nominal)
+        for i in range(len(times) - 1)
+    ]
+    p50, p90, p99 = percentiles(jitter)
+    drift = utime.ticks_diff(times[-1], times[0]) - nominal * (len(times) - 1)
+    report(
+        "poll_fixed_rate_jitter" if fixed_rate else "poll_jitter",
+        samples,
+        elapsed,
+        interval_us=nominal,
+        jitter_p50_us=p50,
+        jitter_p90_us=p90,
+        jitter_p99_us=p99,
+        jitter_max_us=max(jitter),
+        drift_us=drift,
+    )
+
+
+if __name__ == "__main__":
+    bench_source()
+    for stages in (1, 5, 10):
+        bench_pipeline(stages)
+    bench_dedup()
+    bench_value_fanout()
+    bench_poll_jitter()
+    bench_poll_jitter(fixed_rate=True)
@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""Benchmarks of the pure-Python and native-compiled pipeline kernels."""
+
+import array
+import gc
+
+import utime
+
+from harness import mem_alloc, report
+
+from ultimo import kernels
+
+try:
+    from ultimo import kernels_native
+except (ImportError, SyntaxError, ValueError):
+    kernels_native = None
+
+ITEMS = 1000
+
+
+def run(scenario, module, function, items):
+    gc.collect()
+    gc.disable()
+    try:
+        start_alloc = mem_alloc()
+        start = utime.ticks_us()
+        function(module)
+        elapsed = utime.ticks_diff(utime.ticks_us(), start)
+        end_alloc = mem_alloc()
+    finally:
+        gc.enable()
+    allocated = None if start_alloc is None else end_alloc - start_alloc
+    implementation = "native" if module is kernels_native else "python"
+    report(
+        "{}_{}".format(scenario, implementation),
+        items,
+        elapsed,
+        allocated,
+        implementation=implementation,
+    )
+
+
+def ewma(module):
+    value = 0.0
+    for i in range(ITEMS):
+        value = module.ewma(value, i, 0.25)
+
+
+def batch_ewma(module):
+    batch = array.array("H", range(ITEMS))
+    module.batch_ewma(batch, [], None, 0.25)
+
+
+def batch_dedup(module):
+    batch = array.array("H", [i // 10 for i in range(ITEMS)])
+    module.batch_dedup(batch, [], None)
+
+
+def median(module, size=9):
+    ordered = array.array("i", [0] * size)
+    values = array.array("i", [0] * size)
+    count = 0
+    for i in range(ITEMS):
+        value = (i * 7919) % 1024
+        index = i % size
+        if count == size:
+            old = values[index]
+        else:
+            old = None
+            count += 1
+        values[index] = value
+        module.median_update(ordered, count, old, value)
+
+
+if __name__ == "__main__":
+    modules = [kernels]
+    if kernels_native is not None:
+        modules.append(kernels_native)
+    for module in modules:
+        run("kernel_ewma", module, ewma, ITEMS)
+        run("kernel_batch_ewma", module, batch_ewma, ITEMS)
+        run("kernel_batch_dedup", module, batch_dedup, ITEMS)
+        run("kernel_median", module, median, ITEMS)
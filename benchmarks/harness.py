@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""Helpers for timing benchmark scenarios and reporting results."""
+
+import gc
+import json
+
+import uasyncio
+import utime
+
+
+def mem_alloc():
+    """Return the bytes allocated on the heap, or None if not available."""
+    if hasattr(gc, "mem_alloc"):
+        return gc.mem_alloc()
+    return None
+
+
+def percentiles(values, fractions=(0.5, 0.9, 0.99)):
+    """Return the given percentiles of a list of values."""
+    values = sorted(values)
+    last = len(values) - 1
+    return [values[int(fraction * last + 0.5)] for fraction in fractions]
+
+
+def report(scenario, items, elapsed_us, allocated=None, **extra):
+    """Print a scenario's results as a line of JSON."""
+    result = {
+        "scenario": scenario,
+        "items": items,
+        "seconds": elapsed_us / 1000000,
+        "items_per_sec": items * 1000000 / elapsed_us if elapsed_us else None,
+        "bytes_per_item": allocated / items if allocated is not None and items else None,
+    }
+    result.update(extra)
+    print(json.dumps(result))
+
+
+def measure(scenario, items, coroutine, **extra):
+    """Run a coroutine, reporting throughput and allocation per item.
+
+    Garbage collection is disabled while the coroutine runs so that the
+    change in allocated memory is not hidden by collections.
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        start_alloc = mem_alloc()
+        start = utime.ticks_us()
+        uasyncio.run(coroutine)
+        elapsed = utime.ticks_diff(utime.ticks_us(), start)
+        end_alloc = mem_alloc()
+    finally:
+        gc.enable()
+    if start_alloc is None:
+        allocated = None
+    else:
+        allocated = end_alloc - start_alloc
+    report(scenario, items, elapsed, allocated, **extra)
@@ -0,0 +1,88 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+import json
+import os
+import subprocess
+import sys
+
+import click
+
+
+@click.command()
+@click.option(
+    "--output", default="bench_output.txt", help="File to write JSON lines results to."
+)
+@click.option("--cpython/--no-cpython", default=True, help="Also run benchmarks in CPython.")
+def bench(output, cpython):
+    """Run benchmarks in micropython and, where possible, CPython"""
+    print("Running Benchmarks")
+    bench_dir = Path("benchmarks")
+    interpreters = [("micropython", ["micropython", "-X", "heapsize=8M"], micropython_env())]
+    if cpython:
+        env = cpython_env()
+        if cpython_available(env):
+            interpreters.append(("cpython", [sys.executable], env))
+        else:
+            print("CPython can't import uasyncio and utime, skipping")
+
+    results = []
+    failures = []
+    for interpreter, command, env in interpreters:
+        for path in sorted(bench_dir.glob("bench_*.py")):
+            print(interpreter, path.name, "... ", end="", flush=True)
+            try:
+                result = subprocess.run(
+                    command + [str(path)], capture_output=True, check=True, env=env
+                )
+            except (OSError, subprocess.CalledProcessError) as exc:
+                failures.append((interpreter, path, exc))
+                print("FAILED")
+                continue
+            for line in result.stdout.decode("utf-8").splitlines():
+                data = json.loads(line)
+                data["interpreter"] = interpreter
+                data["benchmark"] = path.stem
+                results.append(data)
+            print("OK")
+    print()
+
+    with open(output, "w") as f:
+        for data in results:
+            f.write(json.dumps(data) + "\n")
+    print("Wrote", len(results), "results to", output)
+
+    for interpreter, path, exc in failures:
+        print("FAILURE: ", interpreter, path.name)
+        print(exc)
+        if isinstance(exc, subprocess.CalledProcessError):
+            print(exc.stderr.decode("utf-8"))
+        print()
+
+    if failures:
+        sys.exit(1)
+
+
+def micropython_env():
+    env = dict(os.environ)
+    env["MICROPYPATH"] = "src:" + env.get('MICROPYPATH', ":.frozen:~/.micropython/lib:/usr/lib/micropython")
+    return env
+
+
+def cpython_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(["src", env.get("PYTHONPATH", "")])
+    return env
+
+
+def cpython_available(env):
+    result = subprocess.run(
+        [sys.executable, "-c", "import uasyncio, utime"], capture_output=True, env=env
+    )
+    return result.returncode == 0
+
+
+if __name__ == "__main__":
+    bench()
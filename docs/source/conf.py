@@ -70,5 +70,6 @@ autodoc_mock_imports = [
     'uasyncio',
     'utime',
     'framebuf',
+    'micropython',
 ]
 autosummary_generate = True
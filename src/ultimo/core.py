@@ -4,7 +4,10 @@
 
 """Core classes and helper functions for the Ultimo framework"""
 
+import array
+
 import uasyncio
+import utime
 
 
 class AFlow:
@@ -49,6 +52,9 @@ class ASink:
     #: The input source for the pipeline.
     source: "ASource | None"
 
+    #: Whether the process method is a plain function rather than a coroutine.
+    synchronous: bool = False
+
     def __init__(self, source=None):
         self.source = source
 
@@ -57,6 +63,8 @@ class ASink:
         if value is None and self.source is not None:
             value = await self.source()
         if value is not None:
+            if self.synchronous:
+                return self.process(value)
             return await self.process(value)
 
     async def process(self, value):
@@ -84,16 +92,22 @@ class ASink:
 
 
 class Consumer(ASink):
-    """A sink that wraps an asynchronous coroutine."""
+    """A sink that wraps an asynchronous coroutine.
 
-    def __init__(self, consumer, args=(), kwargs={}, source=None):
+    If synchronous is True the consumer is a plain function which is called
+    directly rather than awaited.
+    """
+
+    def __init__(self, consumer, args=(), kwargs={}, source=None, synchronous=False):
         super().__init__(source)
         self.consumer = consumer
         self.args = args
         self.kwargs = kwargs
+        self.synchronous = synchronous
 
-    async def process(self, value):
-        return await self.consumer(value, *self.args, **self.kwargs)
+    def process(self, value):
+        # returns a coroutine to be awaited unless synchronous
+        return self.consumer(value, *self.args, **self.kwargs)
 
 
 class EventFlow(AFlow):
@@ -133,6 +147,59 @@ class ThreadSafeSource(ASource):
         self.event = uasyncio.ThreadSafeFlag()
 
 
+class BufferedEventFlow(AFlow):
+    """Flow which emits each event queued by a BufferedThreadSafeSource."""
+
+    async def __anext__(self):
+        source = self.source
+        while source.read == source.write:
+            await source.event.wait()
+        return await super().__anext__()
+
+
+class BufferedThreadSafeSource(ThreadSafeSource):
+    """Base class for interrupt-driven sources which queue every event.
+
+    Interrupt handlers call the record method with an integer value, which
+    is stored with its ticks_us timestamp in preallocated arrays without
+    allocating memory.  The flow then emits every queued event in order as
+    a (ticks_us, value) tuple.  Events which arrive when the buffer is full
+    are discarded and counted as overruns.
+    """
+
+    flow = BufferedEventFlow
+
+    def __init__(self, size=32, typecode="i"):
+        super().__init__()
+        # one slot is kept free to tell a full buffer from an empty one
+        self.size = size + 1
+        self.ticks = array.array("i", [0] * self.size)
+        self.values = array.array(typecode, [0] * self.size)
+        self.read = 0
+        self.write = 0
+        self.overruns = 0
+
+    def record(self, value):
+        """Queue an event value; this is safe to call in an interrupt handler."""
+        write = self.write
+        next_write = (write + 1) % self.size
+        if next_write == self.read:
+            self.overruns += 1
+        else:
+            self.ticks[write] = utime.ticks_us()
+            self.values[write] = value
+            self.write = next_write
+        self.event.set()
+
+    async def __call__(self):
+        read = self.read
+        if read == self.write:
+            return None
+        event = (self.ticks[read], self.values[read])
+        self.read = (read + 1) % self.size
+        return event
+
+
 class APipelineFlow(AFlow):
     """Base class for iterators over pipeline sources."""
 
@@ -153,11 +220,51 @@ class APipelineFlow(AFlow):
             raise StopAsyncIteration()
 
 
+class FusedFlow(APipelineFlow):
+    """Flow which runs a linear chain of pipelines as a single iterator.
+
+    Upstream pipelines which use the default flow and call behaviour are
+    folded into this flow, so each value calls every stage's process method
+    in turn rather than passing through a nested flow per stage.
+    """
+
+    def __init__(self, source: "APipeline"):
+        AFlow.__init__(self, source)
+        pipelines = [source]
+        upstream = source.source
+        while _fusable(upstream):
+            pipelines.append(upstream)
+            upstream = upstream.source
+        pipelines.reverse()
+        self.pipelines = tuple(pipelines)
+        self.stages = tuple(
+            (pipeline.process, pipeline.synchronous)
+            if _fusable(pipeline)
+            else (pipeline, False)
+            for pipeline in pipelines
+        )
+        self.flow = aiter(upstream)
+
+    async def __anext__(self):
+        async for value in self.flow:
+            for process, synchronous in self.stages:
+                if synchronous:
+                    value = process(value)
+                else:
+                    value = await process(value)
+                if value is None:
+                    break
+            else:
+                return value
+        else:
+            raise StopAsyncIteration()
+
+
 class APipeline(ASource, ASink):
     """Base class for combined source/sink objects."""
 
     #: The flow factory class variable used to create an iterator.
-    flow: "type[APipelineFlow]" = APipelineFlow
+    flow: "type[APipelineFlow]" = FusedFlow
 
     async def __call__(self, value=None):
         """Transform an input source value."""
@@ -166,12 +273,296 @@ class APipeline(ASource, ASink):
             value = await self.source()
 
         if value is not None:
+            if self.synchronous:
+                return self.process(value)
             return await self.process(value)
 
     async def process(self, value):
         return value
 
 
+def _fusable(source):
+    # a pipeline can be run inline if it relies on the default behaviour
+    return (
+        isinstance(source, APipeline)
+        and source.flow is FusedFlow
+        and type(source).__call__ is APipeline.__call__
+    )
+
+
+class MulticastFlow(AFlow):
+    """Flow which receives values shared by a Multicast source."""
+
+    source: "Multicast"
+
+    def __init__(self, source: "Multicast"):
+        super().__init__(source)
+        self.value = None
+        self.dropped = 0
+        self.closed = False
+        self.event = uasyncio.Event()
+
+    def publish(self, value):
+        """Store a value in the slot, replacing any unconsumed value."""
+        if self.value is not None:
+            self.dropped += 1
+        self.value = value
+        self.event.set()
+
+    def close(self):
+        """Stop iterating once any pending value has been consumed.
+
+        This also unsubscribes the flow, so consumers which stop iterating
+        early should call this to let the upstream task stop.
+        """
+        self.closed = True
+        self.event.set()
+        self.source.unsubscribe(self)
+
+    async def __anext__(self):
+        while (value := self.value) is None:
+            if self.closed:
+                self.source.unsubscribe(self)
+                raise StopAsyncIteration()
+            self.event.clear()
+            await self.event.wait()
+        self.value = None
+        return value
+
+
+class Multicast(APipeline):
+    """Pipeline that shares a single upstream flow between many iterators.
+
+    One task iterates the upstream source and stores each value in a slot
+    held by each subscribed flow.  Subscribers which fall behind only see the
+    most recent value, so they never hold up faster subscribers.
+    """
+
+    flow = MulticastFlow
+
+    def __init__(self, source=None):
+        super().__init__(source)
+        self.flows = []
+        self.value = None
+        self.task = None
+
+    async def __call__(self, value=None):
+        if value is None and self.task is not None and self.value is not None:
+            return self.value
+        return await super().__call__(value)
+
+    def __aiter__(self):
+        flow = self.flow(self)
+        self.flows.append(flow)
+        if self.task is None:
+            self.task = self.create_task()
+        return flow
+
+    async def process(self, value):
+        self.value = value
+        for flow in self.flows:
+            flow.publish(value)
+        return value
+
+    async def run(self):
+        """Consume the upstream source, sharing values with subscribers."""
+        task = self.task
+        await super().run()
+        if self.task is task:
+            # upstream is exhausted, so subscribers are done too
+            self.task = None
+            for flow in list(self.flows):
+                flow.close()
+
+    def unsubscribe(self, flow):
+        """Stop sharing values with a flow, stopping the task if it was the last."""
+        if flow in self.flows:
+            self.flows.remove(flow)
+        if not self.flows and self.task is not None:
+            task = self.task
+            self.task = None
+            task.cancel()
+
+
+class CombinatorFlow(AFlow):
+    """Base class for flows which gather values from several sources.
+
+    Each input flow is pumped by a small task which stores its values in a
+    slot and wakes the combined flow, so a consumer only needs to await a
+    single event.  The tasks are started by the first call to __anext__ and
+    run until the inputs are exhausted or the flow is closed.
+    """
+
+    source: "ACombinator"
+
+    def __init__(self, source: "ACombinator"):
+        super().__init__(source)
+        count = len(source.sources)
+        self.values = [None] * count
+        self.active = count
+        self.ready = uasyncio.Event()
+        self.taken = uasyncio.Event()
+        self.tasks = None
+
+    def start(self):
+        """Start the tasks pumping the input sources, if not already started."""
+        if self.tasks is None:
+            self.tasks = [
+                uasyncio.create_task(self.pump(index, input_source))
+                for index, input_source in enumerate(self.source.sources)
+            ]
+
+    async def pump(self, index, input_source):
+        """Store values from an input source in its slot."""
+        try:
+            async for value in input_source:
+                await self.store(index, value)
+                self.ready.set()
+        except uasyncio.CancelledError:
+            pass
+        self.active -= 1
+        self.ready.set()
+
+    async def store(self, index, value):
+        """Store a value from an input.  Subclasses may override."""
+        self.values[index] = value
+
+    def close(self):
+        """Stop the tasks pumping the input sources."""
+        if self.tasks is None:
+            # never started, so there is nothing left to pump
+            self.active = 0
+        else:
+            for task in self.tasks:
+                task.cancel()
+        self.tasks = []
+
+
+class ACombinator(ASource):
+    """Base class for sources which combine several sources."""
+
+    def __init__(self, *sources):
+        self.sources = sources
+
+
+class MergeFlow(CombinatorFlow):
+    """Flow which emits values from any input as they arrive."""
+
+    def __init__(self, source: "Merge"):
+        super().__init__(source)
+        self.next_index = 0
+
+    async def store(self, index, value):
+        # wait for any previous value from this input to be consumed
+        while self.values[index] is not None:
+            self.taken.clear()
+            await self.taken.wait()
+        self.values[index] = value
+
+    async def __anext__(self):
+        self.start()
+        values = self.values
+        count = len(values)
+        while True:
+            # take turns between inputs so a busy one can't starve the rest
+            for offset in range(count):
+                index = (self.next_index + offset) % count
+                if (value := values[index]) is not None:
+                    values[index] = None
+                    self.next_index = (index + 1) % count
+                    self.taken.set()
+                    return value
+            if not self.active:
+                raise StopAsyncIteration()
+            self.ready.clear()
+            await self.ready.wait()
+
+
+class Merge(ACombinator):
+    """Source which emits the values of several sources as they arrive."""
+
+    flow = MergeFlow
+
+    async def __call__(self):
+        for source in self.sources:
+            if (value := await source()) is not None:
+                return value
+
+
+class ZipFlow(AFlow):
+    """Flow which emits a tuple of the next value of each input."""
+
+    source: "Zip"
+
+    def __init__(self, source: "Zip"):
+        super().__init__(source)
+        self.flows = [aiter(input_source) for input_source in source.sources]
+
+    async def __anext__(self):
+        values = []
+        for flow in self.flows:
+            values.append(await anext(flow))
+        return tuple(values)
+
+
+class Zip(ACombinator):
+    """Source which pairs up the values of several sources."""
+
+    flow = ZipFlow
+
+    async def __call__(self):
+        values = []
+        for source in self.sources:
+            if (value := await source()) is None:
+                return None
+            values.append(value)
+        return tuple(values)
+
+
+class CombineLatestFlow(CombinatorFlow):
+    """Flow which emits the latest values of all inputs when any changes."""
+
+    def __init__(self, source: "CombineLatest"):
+        super().__init__(source)
+        self.changed = False
+
+    async def store(self, index, value):
+        self.values[index] = value
+        self.changed = True
+
+    async def __anext__(self):
+        self.start()
+        values = self.values
+        while not (self.changed and None not in values):
+            if not self.active:
+                raise StopAsyncIteration()
+            self.ready.clear()
+            await self.ready.wait()
+        self.changed = False
+        return tuple(values)
+
+
+class CombineLatest(Zip):
+    """Source which emits the latest value of every source when any changes."""
+
+    flow = CombineLatestFlow
+
+
+def merge(*sources):
+    """Combine sources into one which emits values from any of them."""
+    return Merge(*sources)
+
+
+def zip(*sources):
+    """Combine sources into one which emits tuples of their values in step."""
+    return Zip(*sources)
+
+
+def combine_latest(*sources):
+    """Combine sources into one which emits tuples of their latest values."""
+    return CombineLatest(*sources)
+
+
 def aiter(iterable):
     """Return an asynchronous iterator for an object."""
     return iterable.__aiter__()
@@ -220,4 +611,8 @@ def asink(afn):
 
 def sink(fn):
     """Turn a synchronous function into a sink."""
-    return asink(asynchronize(fn))
+
+    def consumer_factory(*args, **kwargs):
+        return Consumer(fn, args, kwargs, synchronous=True)
+
+    return consumer_factory
@@ -5,6 +5,7 @@
 """Core classes and helper functions for the Ultimo framework"""
 
 import inspect
+from array import array
 from typing import (
     Any,
     AsyncIterator,
@@ -54,6 +55,9 @@ class ASource(Generic[Returned]):
 class ASink(Generic[Consumed]):
     """Base class for consumers of sources."""
 
+    #: Whether the process method is a plain function rather than a coroutine.
+    synchronous: bool
+
     def __init__(self, source: ASource[Consumed] | None = None): ...
 
     async def __call__(self, value: Consumed | None = None) -> Any:
@@ -72,17 +76,23 @@ class ASink(Generic[Consumed]):
 
 
 class Consumer(ASink[Consumed]):
-    """A sink that wraps an asynchronous coroutine."""
+    """A sink that wraps an asynchronous coroutine.
+
+    If synchronous is True the consumer is a plain function which is called
+    directly rather than awaited.
+    """
 
     def __init__(
             self,
-            consumer: Callable[Concatenate[Consumed, P], Coroutine[Any, Any, None]],
+            consumer: Callable[Concatenate[Consumed, P], Coroutine[Any, Any, None] | None],
             args: tuple[Any, ...] = (),
             kwargs: dict[str, Any] = {},
             source: ASource | None = None,
+            synchronous: bool = False,
         ): ...
 
-    async def process(self, value: Consumed) -> None: ...
+    def process(self, value: Consumed) -> Coroutine[Any, Any, None] | None:
+        """Call the consumer, returning a coroutine unless synchronous."""
 
 class EventFlow(AFlow[Returned]):
     """Flow which awaits an Event and then gets the source value."""
@@ -107,6 +117,50 @@ class ThreadSafeSource(EventSource[Returned]):
     #: An uasyncio ThreadSafeSource which is set to wake the iterators.
     event: uasyncio.ThreadSafeSource
 
+class BufferedEventFlow(AFlow[tuple[int, int]]):
+    """Flow which emits each event queued by a BufferedThreadSafeSource."""
+
+    #: The source that created the flow.
+    source: "BufferedThreadSafeSource"
+
+class BufferedThreadSafeSource(ThreadSafeSource[tuple[int, int]]):
+    """Base class for interrupt-driven sources which queue every event.
+
+    Interrupt handlers call the record method with an integer value, which
+    is stored with its ticks_us timestamp in preallocated arrays without
+    allocating memory.  The flow then emits every queued event in order as
+    a (ticks_us, value) tuple.  Events which arrive when the buffer is full
+    are discarded and counted as overruns.
+    """
+
+    flow: type[BufferedEventFlow] = BufferedEventFlow
+
+    #: The number of slots in the ring buffer, one more than its capacity.
+    size: int
+
+    #: The ticks_us timestamps of the queued events.
+    ticks: array
+
+    #: The values of the queued events.
+    values: array
+
+    #: The index of the next event to emit.
+    read: int
+
+    #: The index where the next event will be recorded.
+    write: int
+
+    #: The number of events discarded because the buffer was full.
+    overruns: int
+
+    def __init__(self, size: int = 32, typecode: str = "i"): ...
+
+    def record(self, value: int) -> None:
+        """Queue an event value; this is safe to call in an interrupt handler."""
+
+    async def __call__(self) -> tuple[int, int] | None:
+        """Remove and return the oldest queued event, or None if there are none."""
+
 class APipelineFlow(AFlow[Returned], Generic[Returned, Consumed]):
     """Base class for iterators over pipeline sources."""
 
@@ -115,11 +169,28 @@ class APipelineFlow(AFlow[Returned], Generic[Returned, Consumed]):
     def __init__(self, source: "APipeline[Returned, Consumed]"): ...
     async def __anext__(self) -> Returned: ...
 
+class FusedFlow(APipelineFlow[Returned, Consumed]):
+    """Flow which runs a linear chain of pipelines as a single iterator.
+
+    Upstream pipelines which use the default flow and call behaviour are
+    folded into this flow, so each value calls every stage's process method
+    in turn rather than passing through a nested flow per stage.
+    """
+
+    #: The pipelines in the chain, in the order they are applied.
+    pipelines: tuple[APipeline[Any, Any], ...]
+
+    #: The process callables of each stage, and whether they are synchronous.
+    stages: tuple[tuple[Callable[[Any], Any], bool], ...]
+
+    #: The flow of the first source which is not part of the chain.
+    flow: AFlow[Any]
+
 class APipeline(ASource[Returned], ASink[Consumed]):
     """Base class for combined source/sink objects."""
 
     #: The flow factory class variable used to create an iterator.
-    flow: type[APipelineFlow[Returned, Consumed]] = APipelineFlow
+    flow: type[APipelineFlow[Returned, Consumed]] = FusedFlow
 
     #: The input source for the pipeline.
     source: "ASource | None"
@@ -130,6 +201,172 @@ class APipeline(ASource[Returned], ASink[Consumed]):
 
     def __ror__(self, other: ASource[Consumed]) -> APipeline[Returned, Consumed]: ...
 
+class MulticastFlow(AFlow[Returned]):
+    """Flow which receives values shared by a Multicast source."""
+
+    source: "Multicast[Returned]"
+
+    #: The slot holding the next value to emit, or None.
+    value: Returned | None
+
+    #: The number of values replaced before they were consumed.
+    dropped: int
+
+    #: Whether the upstream source has been exhausted.
+    closed: bool
+
+    #: An uasyncio Event which is set when a value is published.
+    event: uasyncio.Event
+
+    def __init__(self, source: "Multicast[Returned]"): ...
+
+    def publish(self, value: Returned) -> None:
+        """Store a value in the slot, replacing any unconsumed value."""
+
+    def close(self) -> None:
+        """Stop iterating once any pending value has been consumed.
+
+        This also unsubscribes the flow, so consumers which stop iterating
+        early should call this to let the upstream task stop.
+        """
+
+    async def __anext__(self) -> Returned: ...
+
+class Multicast(APipeline[Returned, Returned]):
+    """Pipeline that shares a single upstream flow between many iterators.
+
+    One task iterates the upstream source and stores each value in a slot
+    held by each subscribed flow.  Subscribers which fall behind only see the
+    most recent value, so they never hold up faster subscribers.
+    """
+
+    flow: type[MulticastFlow[Returned]] = MulticastFlow
+
+    #: The currently subscribed flows.
+    flows: list[MulticastFlow[Returned]]
+
+    #: The most recent value from the upstream source.
+    value: Returned | None
+
+    #: The task consuming the upstream source, or None.
+    task: uasyncio.Task | None
+
+    def __init__(self, source: ASource[Returned] | None = None): ...
+
+    async def __call__(self, value: Returned | None = None) -> Returned | None:
+        """Get the most recent shared value, or the source's current value."""
+
+    def __aiter__(self) -> MulticastFlow[Returned]:
+        """Subscribe a new flow, starting the upstream task if needed."""
+
+    async def run(self) -> None:
+        """Consume the upstream source, sharing values with subscribers."""
+
+    def unsubscribe(self, flow: MulticastFlow[Returned]) -> None:
+        """Stop sharing values with a flow, stopping the task if it was the last."""
+
+    def __ror__(self, other: ASource[Returned]) -> Multicast[Returned]: ...
+
+class CombinatorFlow(AFlow[Returned]):
+    """Base class for flows which gather values from several sources.
+
+    Each input flow is pumped by a small task which stores its values in a
+    slot and wakes the combined flow, so a consumer only needs to await a
+    single event.  The tasks are started by the first call to __anext__ and
+    run until the inputs are exhausted or the flow is closed.
+    """
+
+    source: "ACombinator[Returned]"
+
+    #: The slots holding the most recent value from each input.
+    values: list[Any]
+
+    #: The number of inputs which are not yet exhausted.
+    active: int
+
+    #: An uasyncio Event which is set when an input stores a value.
+    ready: uasyncio.Event
+
+    #: An uasyncio Event which is set when the flow consumes a value.
+    taken: uasyncio.Event
+
+    #: The tasks pumping each input, or None before the flow is started.
+    tasks: list[uasyncio.Task] | None
+
+    def __init__(self, source: "ACombinator[Returned]"): ...
+
+    def start(self) -> None:
+        """Start the tasks pumping the input sources, if not already started."""
+
+    async def pump(self, index: int, input_source: ASource[Any]) -> None:
+        """Store values from an input source in its slot."""
+
+    async def store(self, index: int, value: Any) -> None:
+        """Store a value from an input.  Subclasses may override."""
+
+    def close(self) -> None:
+        """Stop the tasks pumping the input sources."""
+
+class ACombinator(ASource[Returned]):
+    """Base class for sources which combine several sources."""
+
+    #: The input sources.
+    sources: tuple[ASource[Any], ...]
+
+    def __init__(self, *sources: ASource[Any]): ...
+
+class MergeFlow(CombinatorFlow[Returned]):
+    """Flow which emits values from any input as they arrive."""
+
+    #: The input which is checked first for the next value.
+    next_index: int
+
+class Merge(ACombinator[Returned]):
+    """Source which emits the values of several sources as they arrive."""
+
+    flow: type[MergeFlow[Returned]] = MergeFlow
+
+    def __init__(self, *sources: ASource[Returned]): ...
+
+    async def __call__(self) -> Returned | None:
+        """Get the first available value of the sources."""
+
+class ZipFlow(AFlow[tuple[Any, ...]]):
+    """Flow which emits a tuple of the next value of each input."""
+
+    source: "Zip"
+
+    #: The flows of each input.
+    flows: list[AFlow[Any]]
+
+class Zip(ACombinator[tuple[Any, ...]]):
+    """Source which pairs up the values of several sources."""
+
+    flow: type[ZipFlow] = ZipFlow
+
+    async def __call__(self) -> tuple[Any, ...] | None:
+        """Get a tuple of the current values of the sources."""
+
+class CombineLatestFlow(CombinatorFlow[tuple[Any, ...]]):
+    """Flow which emits the latest values of all inputs when any changes."""
+
+    #: Whether any input has stored a value since the last tuple was emitted.
+    changed: bool
+
+class CombineLatest(Zip):
+    """Source which emits the latest value of every source when any changes."""
+
+    flow: type[CombineLatestFlow] = CombineLatestFlow
+
+def merge(*sources: ASource[Returned]) -> Merge[Returned]:
+    """Combine sources into one which emits values from any of them."""
+
+def zip(*sources: ASource[Any]) -> Zip:
+    """Combine sources into one which emits tuples of their values in step."""
+
+def combine_latest(*sources: ASource[Any]) -> CombineLatest:
+    """Combine sources into one which emits tuples of their latest values."""
+
 def aiter(iterable) -> AsyncIterator:
     """Return an asynchronous iterator for an object."""
     return iterable.__aiter__()
@@ -8,3 +8,8 @@
 def linear(x, y, t):
     """Linear interpolation between x and y."""
     return (1 - t) * x + t * y
+
+
+def fixed_linear(x, y, numerator, denominator):
+    """Integer linear interpolation between x and y by numerator/denominator."""
+    return x + (y - x) * numerator // denominator
@@ -11,3 +11,6 @@ value = TypeVar("value")
 
 def linear(x: value, y: value, t: SupportsFloat) -> value:
     """Linear interpolation between x and y."""
+
+def fixed_linear(x: int, y: int, numerator: int, denominator: int) -> int:
+    """Integer linear interpolation between x and y by numerator/denominator."""
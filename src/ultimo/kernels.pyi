@@ -0,0 +1,27 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""Pure-Python inner loops of the numeric pipelines."""
+
+from array import array
+from typing import Any, Sequence, SupportsFloat
+
+def ewma(value: float, new_value: float, weight: SupportsFloat) -> float:
+    """Move a value towards a new value by a weight."""
+
+def batch_ewma(
+    batch: Sequence[float], result: list[float], value: float | None, weight: SupportsFloat
+) -> float | None:
+    """Append the EWMA of each value of a batch to a list, returning the last."""
+
+def batch_dedup(batch: Sequence[Any], result: list[Any], value: Any) -> Any:
+    """Append values of a batch which differ from the previous, returning the last."""
+
+def median_update(
+    ordered: array, count: int, old: float | None, value: float
+) -> float:
+    """Replace a value in a sorted array in place, returning the median.
+
+    If old is None the value is added at index count - 1 instead.
+    """
@@ -0,0 +1,64 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""Native-compiled inner loops of the numeric pipelines.
+
+These are copies of the functions in :py:mod:`ultimo.kernels` compiled with
+the native code emitter.  Importing this module fails on CPython and on
+ports without the emitter, in which case the pure-Python versions are used.
+"""
+
+import micropython
+
+
+@micropython.native
+def ewma(value, new_value, weight):
+    """Move a value towards a new value by a weight."""
+    return value + weight * (new_value - value)
+
+
+@micropython.native
+def batch_ewma(batch, result, value, weight):
+    """Append the EWMA of each value of a batch to a list, returning the last."""
+    for new_value in batch:
+        if value is None:
+            value = new_value
+        else:
+            value = value + weight * (new_value - value)
+        result.append(value)
+    return value
+
+
+@micropython.native
+def batch_dedup(batch, result, value):
+    """Append values of a batch which differ from the previous, returning the last."""
+    for new_value in batch:
+        if new_value != value:
+            value = new_value
+            result.append(value)
+    return value
+
+
+@micropython.native
+def median_update(ordered, count, old, value):
+    """Replace a value in a sorted array in place, returning the median.
+
+    If old is None the value is added at index count - 1 instead.
+    """
+    if old is None:
+        i = count - 1
+    else:
+        # remove the old value by shifting later values down
+        i = 0
+        while ordered[i] != old:
+            i += 1
+        while i < count - 1:
+            ordered[i] = ordered[i + 1]
+            i += 1
+    # insert the new value by shifting larger values up
+    while i > 0 and ordered[i - 1] > value:
+        ordered[i] = ordered[i - 1]
+        i -= 1
+    ordered[i] = value
+    return ordered[(count - 1) // 2]
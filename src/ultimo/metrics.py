@@ -0,0 +1,202 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""Optional instrumentation of flows, pipelines and sinks."""
+
+import sys
+
+import uasyncio
+import utime
+
+from . import core, pipelines, poll, stream
+from .core import AFlow, APipeline, ASink, FusedFlow, asynchronize
+from .poll import Poll
+
+
+class Metrics:
+    """Counts and timings for a single source, pipeline or sink."""
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+        self.count = 0
+        self.none_count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+        self.last_ticks = None
+
+    def record(self, start, dropped):
+        """Record a call which started at the given ticks_us."""
+        now = utime.ticks_us()
+        elapsed = utime.ticks_diff(now, start)
+        if dropped:
+            self.none_count += 1
+        else:
+            self.count += 1
+            self.last_ticks = now
+        self.total_us += elapsed
+        if self.min_us is None or elapsed < self.min_us:
+            self.min_us = elapsed
+        if elapsed > self.max_us:
+            self.max_us = elapsed
+
+    @property
+    def mean_us(self):
+        """The mean time taken per call in microseconds."""
+        calls = self.count + self.none_count
+        if calls:
+            return self.total_us / calls
+        else:
+            return None
+
+    def __str__(self):
+        return "{} {} count={} none={} min_us={} mean_us={} max_us={} last_ticks={}".format(
+            self.kind,
+            self.name,
+            self.count,
+            self.none_count,
+            self.min_us,
+            self.mean_us,
+            self.max_us,
+            self.last_ticks,
+        )
+
+
+#: Metrics for each instrumented object, keyed by kind and then by object.
+registry = {"flow": {}, "pipeline": {}, "sink": {}}
+
+_originals = None
+
+# the objects being timed by each task, so that overrides which call the
+# overridden method are only recorded once
+_active = set()
+
+
+def get_metrics(kind, obj):
+    """Get the metrics for an object, creating them if needed."""
+    metrics = registry[kind]
+    if obj not in metrics:
+        metrics[obj] = Metrics(kind, "{}@{:x}".format(type(obj).__name__, id(obj)))
+    return metrics[obj]
+
+
+def _metered_anext(flow_anext):
+    async def metered_anext(self):
+        key = (id(self), id(uasyncio.current_task()))
+        if key in _active:
+            return await flow_anext(self)
+        _active.add(key)
+        start = utime.ticks_us()
+        try:
+            value = await flow_anext(self)
+        except StopAsyncIteration:
+            get_metrics("flow", self.source).record(start, True)
+            raise
+        finally:
+            _active.discard(key)
+        get_metrics("flow", self.source).record(start, False)
+        return value
+
+    return metered_anext
+
+
+def _metered_call(kind, call):
+    async def metered_call(self, value=None):
+        key = (id(self), id(uasyncio.current_task()))
+        if key in _active:
+            return await call(self, value)
+        _active.add(key)
+        start = utime.ticks_us()
+        try:
+            result = await call(self, value)
+        finally:
+            _active.discard(key)
+        get_metrics(kind, self).record(start, kind == "pipeline" and result is None)
+        return result
+
+    return metered_call
+
+
+async def _metered_fused_anext(self):
+    # call each pipeline rather than its process so every stage is recorded
+    async for value in self.flow:
+        for pipeline in self.pipelines:
+            value = await pipeline(value)
+            if value is None:
+                break
+        else:
+            return value
+    else:
+        raise StopAsyncIteration()
+
+
+def enable(*modules):
+    """Start recording metrics for all flows, pipelines and sinks.
+
+    Every flow, pipeline and sink class in Ultimo is instrumented, including
+    those which override __anext__ or __call__.  Custom classes which
+    override these methods are instrumented if their modules are passed in.
+    """
+    global _originals
+    if _originals is not None:
+        return
+    _originals = []
+    instrumented = set()
+    for module in (core, pipelines, poll, stream) + modules:
+        for cls in module.__dict__.values():
+            if not isinstance(cls, type) or cls in instrumented:
+                continue
+            # classes imported from other modules are seen more than once
+            instrumented.add(cls)
+            methods = cls.__dict__
+            if issubclass(cls, AFlow) and "__anext__" in methods:
+                name = "__anext__"
+                if cls is FusedFlow:
+                    wrapper = _metered_fused_anext
+                else:
+                    wrapper = _metered_anext(methods[name])
+            elif issubclass(cls, ASink) and "__call__" in methods:
+                name = "__call__"
+                kind = "pipeline" if issubclass(cls, APipeline) else "sink"
+                wrapper = _metered_call(kind, methods[name])
+            else:
+                continue
+            _originals.append((cls, name, methods[name]))
+            setattr(cls, name, wrapper)
+
+
+def disable():
+    """Stop recording metrics, restoring the original methods."""
+    global _originals
+    if _originals is None:
+        return
+    for cls, name, method in _originals:
+        setattr(cls, name, method)
+    _originals = None
+
+
+def reset():
+    """Remove all recorded metrics."""
+    for metrics in registry.values():
+        metrics.clear()
+
+
+def report():
+    """Return a text report of the recorded metrics, one line per object."""
+    lines = []
+    for metrics in registry.values():
+        for item in metrics.values():
+            lines.append(str(item) + "\n")
+    return "".join(lines)
+
+
+def dump(stream=sys.stdout):
+    """Write a report of the recorded metrics to a stream."""
+    stream.write(report())
+
+
+def metrics_source(interval=1.0):
+    """Create a Poll source which emits a report of the metrics periodically."""
+    return Poll(asynchronize(report), interval)
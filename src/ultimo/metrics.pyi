@@ -0,0 +1,78 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""Optional instrumentation of flows, pipelines and sinks."""
+
+import sys
+from types import ModuleType
+from typing import Any, IO, Literal, TypeAlias
+
+from .poll import Poll
+
+Kind: TypeAlias = Literal["flow", "pipeline", "sink"]
+
+class Metrics:
+    """Counts and timings for a single source, pipeline or sink."""
+
+    #: The kind of object being measured.
+    kind: Kind
+
+    #: A name identifying the object being measured.
+    name: str
+
+    #: The number of calls which produced a value.
+    count: int
+
+    #: The number of calls which produced None, or ended a flow.
+    none_count: int
+
+    #: The total time spent in calls in microseconds.
+    total_us: int
+
+    #: The shortest call in microseconds, or None.
+    min_us: int | None
+
+    #: The longest call in microseconds.
+    max_us: int
+
+    #: The ticks_us of the last call which produced a value, or None.
+    last_ticks: int | None
+
+    def __init__(self, kind: Kind, name: str): ...
+
+    def record(self, start: int, dropped: bool) -> None:
+        """Record a call which started at the given ticks_us."""
+
+    @property
+    def mean_us(self) -> float | None:
+        """The mean time taken per call in microseconds."""
+
+#: Metrics for each instrumented object, keyed by kind and then by object.
+registry: dict[Kind, dict[Any, Metrics]]
+
+def get_metrics(kind: Kind, obj: Any) -> Metrics:
+    """Get the metrics for an object, creating them if needed."""
+
+def enable(*modules: ModuleType) -> None:
+    """Start recording metrics for all flows, pipelines and sinks.
+
+    Every flow, pipeline and sink class in Ultimo is instrumented, including
+    those which override __anext__ or __call__.  Custom classes which
+    override these methods are instrumented if their modules are passed in.
+    """
+
+def disable() -> None:
+    """Stop recording metrics, restoring the original methods."""
+
+def reset() -> None:
+    """Remove all recorded metrics."""
+
+def report() -> str:
+    """Return a text report of the recorded metrics, one line per object."""
+
+def dump(stream: IO[str] = sys.stdout) -> None:
+    """Write a report of the recorded metrics to a stream."""
+
+def metrics_source(interval: float = 1.0) -> Poll[str]:
+    """Create a Poll source which emits a report of the metrics periodically."""
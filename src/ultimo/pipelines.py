@@ -4,35 +4,67 @@
 
 """Core pipeline classes for common operations"""
 
+import array
+import struct
+from collections import namedtuple
+
+import uasyncio
 import utime
 
-from ultimo.core import APipeline, APipelineFlow, asynchronize
-from ultimo.interpolate import linear
+from ultimo.core import AFlow, APipeline, APipelineFlow
+
+try:
+    from ultimo.kernels_native import batch_dedup, batch_ewma, ewma, median_update
+except (ImportError, SyntaxError, ValueError):
+    from ultimo.kernels import batch_dedup, batch_ewma, ewma, median_update
+
+DROP_OLDEST = 0
+DROP_NEWEST = 1
+BLOCK = 2
 
 
 class Apply(APipeline):
-    """Pipeline that applies a callable to each value."""
+    """Pipeline that applies a callable to each value.
+
+    If synchronous is True the callable is a plain function which is called
+    directly, otherwise it is an asynchronous function which is awaited.
+    """
 
-    def __init__(self, coroutine, args=(), kwargs={}, source=None):
+    def __init__(self, coroutine, args=(), kwargs={}, source=None, synchronous=False):
         super().__init__(source)
         self.coroutine = coroutine
         self.args = args
         self.kwargs = kwargs
+        self.synchronous = synchronous
 
-    async def process(self, value):
-        return await self.coroutine(value, *self.args, **self.kwargs)
+    def process(self, value):
+        # returns a coroutine to be awaited unless synchronous
+        return self.coroutine(value, *self.args, **self.kwargs)
 
 
 class Filter(APipeline):
-    """Pipeline that filters values."""
+    """Pipeline that filters values.
 
-    def __init__(self, filter, args=(), kwargs={}, source=None):
+    If synchronous is True the filter is a plain function which is called
+    directly, otherwise it is an asynchronous function which is awaited.
+    """
+
+    def __init__(self, filter, args=(), kwargs={}, source=None, synchronous=False):
         super().__init__(source)
         self.filter = filter
         self.args = args
         self.kwargs = kwargs
+        self.synchronous = synchronous
 
-    async def process(self, value):
+    def process(self, value):
+        if not self.synchronous:
+            return self._aprocess(value)
+        if self.filter(value, *self.args, **self.kwargs):
+            return value
+        else:
+            return None
+
+    async def _aprocess(self, value):
         if await self.filter(value, *self.args, **self.kwargs):
             return value
         else:
@@ -49,16 +81,199 @@ class Debounce(APipeline):
         self.value = None
 
     async def __call__(self, value=None):
-        if (
-            self.last_change is None
-            or utime.ticks_diff(utime.ticks_ms(), self.last_change) > self.delay
-        ):
+        now = utime.ticks_ms()
+        if self.last_change is None or utime.ticks_diff(now, self.last_change) > self.delay:
             self.value = await super().__call__(value)
-            self.last_change = utime.ticks_ms()
+            self.last_change = now
 
         return self.value
 
 
+class Throttle(APipeline):
+    """Pipeline that emits at most one value per interval, dropping the rest."""
+
+    synchronous = True
+
+    def __init__(self, interval=0.1, source=None):
+        super().__init__(source)
+        self.interval = interval * 1000
+        self.last_emit = None
+
+    def process(self, value):
+        now = utime.ticks_ms()
+        if self.last_emit is not None and utime.ticks_diff(now, self.last_emit) < self.interval:
+            return None
+        self.last_emit = now
+        return value
+
+
+class SampleFlow(AFlow):
+    """Flow which gets the current value of the source at a regular interval.
+
+    If the source has no value at a sample time, such as when an upstream
+    filter rejects it, the flow waits for the next sample time.
+    """
+
+    def __init__(self, source):
+        super().__init__(source)
+        self.deadline = None
+
+    async def __anext__(self):
+        while True:
+            if self.deadline is None:
+                self.deadline = utime.ticks_ms()
+            else:
+                self.deadline = utime.ticks_add(self.deadline, self.source.interval)
+                delay = utime.ticks_diff(self.deadline, utime.ticks_ms())
+                if delay > 0:
+                    await uasyncio.sleep_ms(delay)
+                else:
+                    # running late, so don't try to catch up
+                    self.deadline = utime.ticks_ms()
+            if (value := await self.source()) is not None:
+                return value
+
+
+class Sample(APipeline):
+    """Pipeline that emits the latest value of the source every interval."""
+
+    flow = SampleFlow
+
+    def __init__(self, interval=0.1, source=None):
+        super().__init__(source)
+        self.interval = int(interval * 1000)
+
+
+class SettleFlow(APipelineFlow):
+    """Flow which emits a value once the source has been quiet for a delay."""
+
+    def __init__(self, source):
+        super().__init__(source)
+        self.value = None
+        self.last_change = None
+        self.closed = False
+        self.event = uasyncio.Event()
+        self.task = None
+
+    async def pump(self):
+        """Consume the upstream flow, recording the latest value."""
+        try:
+            async for source_value in self.flow:
+                if (value := await self.source(source_value)) is not None:
+                    self.record(value)
+                    self.event.set()
+        except uasyncio.CancelledError:
+            pass
+        self.closed = True
+        self.event.set()
+
+    def record(self, value):
+        """Record a new value from the upstream flow."""
+        self.value = value
+        self.last_change = utime.ticks_ms()
+
+    def remaining(self):
+        """The time in milliseconds until the current value has settled."""
+        return self.source.delay - utime.ticks_diff(utime.ticks_ms(), self.last_change)
+
+    def close(self):
+        """Stop consuming the upstream flow."""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def __anext__(self):
+        if self.task is None and not self.closed:
+            self.task = uasyncio.create_task(self.pump())
+        while True:
+            if self.value is None:
+                if self.closed:
+                    self.task = None
+                    raise StopAsyncIteration()
+                self.event.clear()
+                await self.event.wait()
+            elif self.closed:
+                # the source is exhausted, so the final value won't change
+                break
+            elif (delay := self.remaining()) > 0:
+                await uasyncio.sleep_ms(delay)
+            else:
+                break
+        value = self.value
+        self.value = None
+        return value
+
+
+class Settle(APipeline):
+    """Pipeline that emits the last value once the source is quiet for a delay."""
+
+    flow = SettleFlow
+
+    def __init__(self, delay=0.1, source=None):
+        super().__init__(source)
+        self.delay = int(delay * 1000)
+
+
+class EdgeDebounceFlow(SettleFlow):
+    """Flow which emits a level once no edges have occurred for the settle time."""
+
+    def __init__(self, source):
+        super().__init__(source)
+        self.level = None
+
+    def record(self, value):
+        if isinstance(value, tuple):
+            # every edge restarts the settle time, even if levels were missed
+            self.last_change, self.level = value
+        elif value != self.level:
+            self.last_change = utime.ticks_us()
+            self.level = value
+        else:
+            return
+        self.value = self.level
+
+    def remaining(self):
+        elapsed = utime.ticks_diff(utime.ticks_us(), self.last_change)
+        # round up so the level is never emitted early
+        return (self.source.settle - elapsed + 999) // 1000
+
+    async def __anext__(self):
+        source = self.source
+        while True:
+            level = await super().__anext__()
+            if level != source.state:
+                source.state = level
+                return level
+
+
+class EdgeDebounce(APipeline):
+    """Pipeline that debounces a digital input from its edges.
+
+    Values are either levels, or (ticks_us, level) tuples of an edge such as
+    those from a BufferedPinInterrupt.  A level is only emitted once there
+    have been no edges for the settle time, and only if it differs from the
+    last stable level.
+    """
+
+    flow = EdgeDebounceFlow
+
+    def __init__(self, settle=0.005, source=None):
+        super().__init__(source)
+        self.settle = int(settle * 1000000)
+        self.state = None
+
+    async def __call__(self, value=None):
+        if value is not None:
+            # pass edges through unchanged so the flow sees their timestamps
+            return value
+        if self.state is not None:
+            return self.state
+        value = await super().__call__()
+        if isinstance(value, tuple):
+            value = value[1]
+        return value
+
+
 class DedupFlow(APipelineFlow):
     def __init__(self, source):
         super().__init__(source)
@@ -83,21 +298,567 @@ class Dedup(APipeline):
 class EWMA(APipeline):
     """Pipeline that smoothes values with an exponentially weighted moving average."""
 
+    synchronous = True
+
     def __init__(self, weight=0.5, source=None):
         super().__init__(source)
         self.weight = weight
         self.value = None
 
-    async def __call__(self, value=None):
-        if value is None and self.source is not None:
-            value = await self.source()
+    def process(self, value):
         if self.value is None:
             self.value = value
         else:
-            self.value = linear(self.value, value, self.weight)
+            self.value = ewma(self.value, value, self.weight)
         return self.value
 
 
+class FixedEWMA(APipeline):
+    """Pipeline that smoothes integer values without floating point arithmetic.
+
+    This is an exponentially weighted moving average with a weight of
+    1/2**shift, computed on an accumulator which holds the average scaled
+    by 2**shift, so the values stay as small integers.
+    """
+
+    synchronous = True
+
+    def __init__(self, shift=1, source=None):
+        super().__init__(source)
+        self.shift = shift
+        self.accumulator = None
+
+    def process(self, value):
+        if self.accumulator is None:
+            self.accumulator = value << self.shift
+        else:
+            self.accumulator += value - (self.accumulator >> self.shift)
+        return self.accumulator >> self.shift
+
+
+class Window(APipeline):
+    """Base class for pipelines that compute statistics of recent values.
+
+    The most recent values are held in a preallocated array which is used
+    as a ring buffer, so processing a value doesn't allocate memory.
+    """
+
+    synchronous = True
+
+    def __init__(self, size=8, typecode="f", source=None):
+        super().__init__(source)
+        self.size = size
+        self.typecode = typecode
+        self.values = array.array(typecode, [0] * size)
+        self.index = 0
+        self.count = 0
+
+    def push(self, value):
+        """Store a value in the ring buffer, returning the value it replaces."""
+        index = self.index
+        old = self.values[index] if self.count == self.size else None
+        self.values[index] = value
+        self.index = (index + 1) % self.size
+        if old is None:
+            self.count += 1
+        return old
+
+
+class MovingAverage(Window):
+    """Pipeline that emits the mean of the most recent values."""
+
+    def __init__(self, size=8, typecode="f", source=None):
+        super().__init__(size, typecode, source)
+        self.total = 0
+
+    def process(self, value):
+        old = self.push(value)
+        if old is not None:
+            self.total -= old
+        # add the stored value, which may have been rounded by the array,
+        # so that the total doesn't drift when it is removed again
+        self.total += self.values[self.index - 1]
+        return self.total / self.count
+
+
+class MovingMin(Window):
+    """Pipeline that emits the minimum of the most recent values.
+
+    The positions of candidate values are kept in a monotonic queue, so each
+    value is only compared with the candidates it supersedes.
+    """
+
+    def __init__(self, size=8, typecode="f", source=None):
+        super().__init__(size, typecode, source)
+        self.queue = array.array("H", [0] * size)
+        self.head = 0
+        self.length = 0
+
+    def supersedes(self, value, candidate):
+        """Whether a new value means an older candidate can't be the result."""
+        return value <= candidate
+
+    def process(self, value):
+        size = self.size
+        values = self.values
+        queue = self.queue
+        index = self.index
+        if self.length and self.count == size and queue[self.head] == index:
+            # the oldest candidate is leaving the window
+            self.head = (self.head + 1) % size
+            self.length -= 1
+        while self.length and self.supersedes(
+            value, values[queue[(self.head + self.length - 1) % size]]
+        ):
+            self.length -= 1
+        self.push(value)
+        queue[(self.head + self.length) % size] = index
+        self.length += 1
+        return values[queue[self.head]]
+
+
+class MovingMax(MovingMin):
+    """Pipeline that emits the maximum of the most recent values."""
+
+    def supersedes(self, value, candidate):
+        return value >= candidate
+
+
+class Median(Window):
+    """Pipeline that emits the median of the most recent values.
+
+    A sorted copy of the window is updated in place as each value arrives,
+    which makes this effective at removing spikes from noisy sensors.
+    """
+
+    def __init__(self, size=5, typecode="f", source=None):
+        super().__init__(size, typecode, source)
+        self.ordered = array.array(typecode, [0] * size)
+
+    def process(self, value):
+        old = self.push(value)
+        return median_update(self.ordered, self.count, old, value)
+
+
+class BatchFlow(APipelineFlow):
+    """Flow which collects values from the source into batches.
+
+    If the batch has a timeout, a task consumes the upstream flow into the
+    buffer so that a partial batch can be emitted on time even when the
+    source stalls.
+    """
+
+    def __init__(self, source):
+        super().__init__(source)
+        if source.typecode is None:
+            self.buffer = [None] * source.size
+        else:
+            self.buffer = array.array(source.typecode, [0] * source.size)
+        self.count = 0
+        self.start = None
+        self.held = False
+        self.closed = False
+        self.task = None
+        self.event = uasyncio.Event()
+        self.space = uasyncio.Event()
+
+    async def pump(self):
+        """Consume the upstream flow into the buffer."""
+        buffer = self.buffer
+        size = len(buffer)
+        try:
+            async for value in self.flow:
+                # wait while the consumer holds a full buffer
+                while self.held or self.count == size:
+                    self.space.clear()
+                    await self.space.wait()
+                if self.count == 0:
+                    self.start = utime.ticks_ms()
+                buffer[self.count] = value
+                self.count += 1
+                self.event.set()
+        except uasyncio.CancelledError:
+            pass
+        self.closed = True
+        self.event.set()
+
+    def close(self):
+        """Stop consuming the upstream flow."""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def take(self):
+        """Emit the values in the buffer, starting a new batch."""
+        buffer = self.buffer
+        count = self.count
+        self.count = 0
+        if count == len(buffer):
+            # the consumer uses the buffer until it asks for the next batch
+            self.held = True
+            return buffer
+        self.space.set()
+        return buffer[:count]
+
+    async def __anext__(self):
+        timeout = self.source.timeout
+        if timeout is None:
+            return await self.collect()
+        if self.held:
+            self.held = False
+            self.space.set()
+        if self.task is None and not self.closed:
+            self.task = uasyncio.create_task(self.pump())
+        size = len(self.buffer)
+        while self.count < size:
+            if self.closed:
+                if self.count:
+                    break
+                self.task = None
+                raise StopAsyncIteration()
+            self.event.clear()
+            if self.count:
+                remaining = timeout - utime.ticks_diff(utime.ticks_ms(), self.start)
+                if remaining <= 0:
+                    break
+                try:
+                    await uasyncio.wait_for_ms(self.event.wait(), int(remaining) + 1)
+                except uasyncio.TimeoutError:
+                    pass
+            else:
+                await self.event.wait()
+        return self.take()
+
+    async def collect(self):
+        """Collect a batch directly from the upstream flow."""
+        buffer = self.buffer
+        size = len(buffer)
+        count = 0
+        async for value in self.flow:
+            buffer[count] = value
+            count += 1
+            if count == size:
+                return buffer
+        else:
+            if count:
+                return buffer[:count]
+            raise StopAsyncIteration()
+
+
+class Batch(APipeline):
+    """Pipeline that collects values into fixed-size batches.
+
+    Each flow holds a preallocated buffer, either a list or an array with the
+    given typecode, which it fills and emits when it is full.  The same buffer
+    is reused for the next batch, so consumers must process a batch before
+    requesting another.  If a timeout is given, a shorter batch is emitted
+    once that many seconds have passed since the first value of the batch
+    arrived, even if the source has stalled.
+    """
+
+    flow = BatchFlow
+
+    def __init__(self, size=32, timeout=None, typecode=None, source=None):
+        super().__init__(source)
+        self.size = size
+        self.timeout = None if timeout is None else timeout * 1000
+        self.typecode = typecode
+
+    async def process(self, value):
+        if self.typecode is None:
+            return [value]
+        else:
+            return array.array(self.typecode, [value])
+
+
+class BatchApply(APipeline):
+    """Pipeline that applies a function to each value of a batch."""
+
+    synchronous = True
+
+    def __init__(self, function, args=(), kwargs={}, source=None):
+        super().__init__(source)
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+
+    def process(self, batch):
+        function = self.function
+        args = self.args
+        kwargs = self.kwargs
+        return [function(value, *args, **kwargs) for value in batch]
+
+
+class BatchFilter(APipeline):
+    """Pipeline that filters the values of a batch."""
+
+    synchronous = True
+
+    def __init__(self, filter, args=(), kwargs={}, source=None):
+        super().__init__(source)
+        self.filter = filter
+        self.args = args
+        self.kwargs = kwargs
+
+    def process(self, batch):
+        filter = self.filter
+        args = self.args
+        kwargs = self.kwargs
+        result = [value for value in batch if filter(value, *args, **kwargs)]
+        if result:
+            return result
+        else:
+            return None
+
+
+class BatchEWMA(APipeline):
+    """Pipeline that smoothes the values of a batch with an EWMA."""
+
+    synchronous = True
+
+    def __init__(self, weight=0.5, source=None):
+        super().__init__(source)
+        self.weight = weight
+        self.value = None
+
+    def process(self, batch):
+        result = []
+        self.value = batch_ewma(batch, result, self.value, self.weight)
+        return result
+
+
+class BatchDedup(APipeline):
+    """Pipeline that removes repeated values from a batch."""
+
+    synchronous = True
+
+    def __init__(self, source=None):
+        super().__init__(source)
+        self.value = None
+
+    def process(self, batch):
+        result = []
+        self.value = batch_dedup(batch, result, self.value)
+        if result:
+            return result
+        else:
+            return None
+
+
+class BufferFlow(AFlow):
+    """Flow which takes values from a Buffer."""
+
+    async def __anext__(self):
+        buffer = self.source
+        if buffer.task is None and buffer.source is not None and not buffer.count:
+            buffer.closed = False
+            buffer.task = buffer.create_task()
+        while not buffer.count:
+            if buffer.closed:
+                raise StopAsyncIteration()
+            buffer.not_empty.clear()
+            await buffer.not_empty.wait()
+        return buffer.get()
+
+
+class Buffer(APipeline):
+    """Pipeline that decouples a source from its consumer with a ring buffer.
+
+    A task consumes the source and adds values to a preallocated buffer,
+    which the flow removes them from.  When the buffer is full, the policy
+    determines whether the oldest value is dropped (DROP_OLDEST), the new
+    value is dropped (DROP_NEWEST), or the producer waits for space (BLOCK).
+    """
+
+    flow = BufferFlow
+
+    def __init__(self, size=16, policy=DROP_OLDEST, source=None):
+        super().__init__(source)
+        self.size = size
+        self.policy = policy
+        self.values = [None] * size
+        self.start = 0
+        self.count = 0
+        self.dropped = 0
+        self.high_water = 0
+        self.closed = False
+        self.task = None
+        self.not_empty = uasyncio.Event()
+        self.not_full = uasyncio.Event()
+
+    async def __call__(self, value=None):
+        """Add a value to the buffer, or get the oldest buffered value."""
+        if value is None:
+            return self.get()
+        await self.put(value)
+
+    async def process(self, value):
+        await self.put(value)
+
+    async def put(self, value):
+        """Add a value to the buffer, applying the policy if it is full."""
+        size = self.size
+        while self.count == size:
+            if self.policy == BLOCK:
+                self.not_full.clear()
+                await self.not_full.wait()
+            elif self.policy == DROP_NEWEST:
+                self.dropped += 1
+                return
+            else:
+                self.values[self.start] = None
+                self.start = (self.start + 1) % size
+                self.count -= 1
+                self.dropped += 1
+        self.values[(self.start + self.count) % size] = value
+        self.count += 1
+        if self.count > self.high_water:
+            self.high_water = self.count
+        self.not_empty.set()
+
+    def get(self):
+        """Remove and return the oldest value, or None if the buffer is empty."""
+        if not self.count:
+            return None
+        value = self.values[self.start]
+        self.values[self.start] = None
+        self.start = (self.start + 1) % self.size
+        self.count -= 1
+        self.not_full.set()
+        return value
+
+    async def run(self):
+        """Consume the source, adding values to the buffer."""
+        await super().run()
+        self.close()
+
+    def close(self):
+        """Stop the flow once the buffered values have been consumed."""
+        self.task = None
+        self.closed = True
+        self.not_empty.set()
+
+
+class Deadband(APipeline):
+    """Pipeline that ignores values close to the last value emitted.
+
+    A value is emitted only when it has risen or fallen from the last
+    emitted value by more than a threshold.  The threshold may be scaled by
+    the last value, and rising and falling values can have separate
+    thresholds to give hysteresis.
+    """
+
+    synchronous = True
+
+    def __init__(self, threshold=0, relative=None, rising=None, falling=None, source=None):
+        super().__init__(source)
+        self.rising = threshold if rising is None else rising
+        self.falling = threshold if falling is None else falling
+        self.relative = relative
+        self.value = None
+
+    def process(self, value):
+        last = self.value
+        if last is not None:
+            rising = self.rising
+            falling = self.falling
+            if self.relative is not None:
+                scaled = self.relative * abs(last)
+                rising = max(rising, scaled)
+                falling = max(falling, scaled)
+            change = value - last
+            if -falling <= change <= rising:
+                return None
+        self.value = value
+        return value
+
+
+class Cache(APipeline):
+    """Pipeline that reuses the source's value for a short time.
+
+    Calling the pipeline returns the last value obtained from the source if
+    it is less than ttl seconds old, rather than calling the source again.
+    Values passing through the pipeline's flow also refresh the cache.
+    """
+
+    def __init__(self, ttl=0.005, source=None):
+        super().__init__(source)
+        self.ttl = ttl * 1000
+        self.value = None
+        self.last_update = None
+        self.hits = 0
+        self.misses = 0
+
+    async def __call__(self, value=None):
+        if value is None:
+            if (
+                self.last_update is not None
+                and utime.ticks_diff(utime.ticks_ms(), self.last_update) < self.ttl
+            ):
+                self.hits += 1
+                return self.value
+            self.misses += 1
+            if self.source is not None:
+                value = await self.source()
+        if value is not None:
+            self.value = value
+            self.last_update = utime.ticks_ms()
+        return value
+
+
+class Unpack(APipeline):
+    """Pipeline that decodes binary records with a struct format.
+
+    Each value is a buffer, such as a memoryview of a frame, which is
+    decoded from the given offset without copying.  If field names are
+    given, values are emitted as named tuples, otherwise as tuples.  Buffers
+    which are too short are dropped and counted in the errors attribute.
+    """
+
+    synchronous = True
+
+    def __init__(self, format, fields=None, offset=0, source=None):
+        super().__init__(source)
+        self.format = format
+        self.size = struct.calcsize(format)
+        self.offset = offset
+        self.record = None if fields is None else namedtuple("Record", fields)
+        self.errors = 0
+
+    def process(self, buffer):
+        if len(buffer) < self.offset + self.size:
+            self.errors += 1
+            return None
+        values = struct.unpack_from(self.format, buffer, self.offset)
+        if self.record is None:
+            return values
+        return self.record(*values)
+
+
+class Pack(APipeline):
+    """Pipeline that encodes values as binary records with a struct format.
+
+    Values are tuples, or single values for one-field formats, which are
+    packed into a reused buffer.  Each emitted value is a memoryview of the
+    buffer, which is only valid until the next value is packed.
+    """
+
+    synchronous = True
+
+    def __init__(self, format, source=None):
+        super().__init__(source)
+        self.format = format
+        self.buffer = bytearray(struct.calcsize(format))
+        self.view = memoryview(self.buffer)
+
+    def process(self, value):
+        if isinstance(value, tuple):
+            struct.pack_into(self.format, self.buffer, 0, *value)
+        else:
+            struct.pack_into(self.format, self.buffer, 0, value)
+        return self.view
+
+
 def apipe(afn):
     """Decorator that produces a pipeline from an async function."""
 
@@ -109,7 +870,11 @@ def apipe(afn):
 
 def pipe(fn):
     """Decorator that produces a pipeline from a function."""
-    return apipe(asynchronize(fn))
+
+    def apply_factory(*args, **kwargs):
+        return Apply(fn, args, kwargs, synchronous=True)
+
+    return apply_factory
 
 
 def afilter(afn):
@@ -123,4 +888,8 @@ def afilter(afn):
 
 def filter(fn):
     """Decorator that produces a filter from a function."""
-    return afilter(asynchronize(fn))
+
+    def filter_factory(*args, **kwargs):
+        return Filter(fn, args, kwargs, synchronous=True)
+
+    return filter_factory
@@ -4,7 +4,8 @@
 
 """Core pipeline classes for common operations"""
 
-from typing import Any, Callable, Self, Coroutine, Concatenate, SupportsFloat
+from array import array
+from typing import Any, Callable, Self, Coroutine, Concatenate, Sequence, SupportsFloat
 
 from ultimo.core import (
     AFlow,
@@ -16,12 +17,26 @@ from ultimo.core import (
     Returned,
     asynchronize,
 )
-from ultimo.interpolate import linear
+
+import uasyncio
+
+#: Overflow policy which drops the oldest buffered value.
+DROP_OLDEST: int
+
+#: Overflow policy which drops the new value.
+DROP_NEWEST: int
+
+#: Overflow policy which waits until there is space in the buffer.
+BLOCK: int
 
 class Apply(APipeline[Returned, Consumed]):
-    """Pipeline that applies a callable to each value."""
+    """Pipeline that applies a callable to each value.
 
-    coroutine: Callable[[Consumed], Coroutine[Any, Any, Returned]]
+    If synchronous is True the callable is a plain function which is called
+    directly, otherwise it is an asynchronous function which is awaited.
+    """
+
+    coroutine: Callable[[Consumed], Coroutine[Any, Any, Returned] | Returned]
 
     args: tuple[Any, ...]
 
@@ -29,18 +44,26 @@ class Apply(APipeline[Returned, Consumed]):
 
     def __init__(
         self,
-        coroutine: Callable[[Consumed], Coroutine[Any, Any, Returned]],
+        coroutine: Callable[[Consumed], Coroutine[Any, Any, Returned] | Returned],
         args: tuple[Any, ...] = (),
         kwargs: dict[str, Any] = {},
         source: ASource[Consumed] | None = None,
+        synchronous: bool = False,
     ): ...
 
+    def process(self, value: Consumed) -> Coroutine[Any, Any, Returned] | Returned:
+        """Call the callable, returning a coroutine unless synchronous."""
+
     def __ror__(self, other: ASource[Consumed]) -> Apply[Returned, Consumed]: ...
 
 class Filter(APipeline[Returned, Returned]):
-    """Pipeline that filters values."""
+    """Pipeline that filters values.
 
-    filter: Callable[[Returned], Coroutine[Any, Any, bool]]
+    If synchronous is True the filter is a plain function which is called
+    directly, otherwise it is an asynchronous function which is awaited.
+    """
+
+    filter: Callable[[Returned], Coroutine[Any, Any, bool] | bool]
 
     args: tuple[Any, ...]
 
@@ -48,12 +71,18 @@ class Filter(APipeline[Returned, Returned]):
 
     def __init__(
         self,
-        filter: Callable[[Returned], Coroutine[Any, Any, bool]],
+        filter: Callable[[Returned], Coroutine[Any, Any, bool] | bool],
         args: tuple[Any, ...] = (),
         kwargs: dict[str, Any] = {},
         source: ASource[Returned] | None = None,
+        synchronous: bool = False,
     ): ...
 
+    def process(
+        self, value: Returned
+    ) -> Coroutine[Any, Any, Returned | None] | Returned | None:
+        """Filter the value, returning a coroutine unless synchronous."""
+
     def __ror__(self, other: ASource[Returned]) -> Filter[Returned]: ...
 
 class Debounce(APipeline[Returned, Returned]):
@@ -74,6 +103,137 @@ class Debounce(APipeline[Returned, Returned]):
 
     def __ror__(self, other: ASource[Returned]) -> Debounce[Returned]: ...
 
+class Throttle(APipeline[Returned, Returned]):
+    """Pipeline that emits at most one value per interval, dropping the rest."""
+
+    synchronous: bool = True
+
+    #: The minimum interval between emitted values in milliseconds.
+    interval: float
+
+    #: The millisecond ticks when a value was last emitted, or None.
+    last_emit: int | None
+
+    def __init__(
+        self, interval: float = 0.1, source: ASource[Returned] | None = None
+    ): ...
+
+    def process(self, value: Returned) -> Returned | None:
+        """Pass the value if the interval has elapsed, otherwise drop it."""
+
+    def __ror__(self, other: ASource[Returned]) -> Throttle[Returned]: ...
+
+class SampleFlow(AFlow[Returned]):
+    """Flow which gets the current value of the source at a regular interval.
+
+    If the source has no value at a sample time, such as when an upstream
+    filter rejects it, the flow waits for the next sample time.
+    """
+
+    source: "Sample[Returned]"
+
+    #: The millisecond ticks when the next value is due.
+    deadline: int | None
+
+class Sample(APipeline[Returned, Returned]):
+    """Pipeline that emits the latest value of the source every interval."""
+
+    flow: type[SampleFlow[Returned]] = SampleFlow
+
+    #: The sampling interval in milliseconds.
+    interval: int
+
+    def __init__(
+        self, interval: float = 0.1, source: ASource[Returned] | None = None
+    ): ...
+
+    def __ror__(self, other: ASource[Returned]) -> Sample[Returned]: ...
+
+class SettleFlow(APipelineFlow[Returned, Returned]):
+    """Flow which emits a value once the source has been quiet for a delay."""
+
+    source: "Settle[Returned]"
+
+    #: The latest value which has not yet been emitted, or None.
+    value: Returned | None
+
+    #: The millisecond ticks when the value last changed.
+    last_change: int | None
+
+    #: Whether the upstream flow is exhausted.
+    closed: bool
+
+    #: An uasyncio Event which is set when the upstream flow produces a value.
+    event: uasyncio.Event
+
+    #: The task consuming the upstream flow, or None.
+    task: uasyncio.Task | None
+
+    async def pump(self) -> None:
+        """Consume the upstream flow, recording the latest value."""
+
+    def record(self, value: Returned) -> None:
+        """Record a new value from the upstream flow."""
+
+    def remaining(self) -> int:
+        """The time in milliseconds until the current value has settled."""
+
+    def close(self) -> None:
+        """Stop consuming the upstream flow."""
+
+class Settle(APipeline[Returned, Returned]):
+    """Pipeline that emits the last value once the source is quiet for a delay."""
+
+    flow: type[SettleFlow[Returned]] = SettleFlow
+
+    #: The quiet time required before emitting in milliseconds.
+    delay: int
+
+    def __init__(
+        self, delay: float = 0.1, source: ASource[Returned] | None = None
+    ): ...
+
+    def __ror__(self, other: ASource[Returned]) -> Settle[Returned]: ...
+
+class EdgeDebounceFlow(SettleFlow[int]):
+    """Flow which emits a level once no edges have occurred for the settle time."""
+
+    source: "EdgeDebounce"
+
+    #: The ticks_us timestamp of the last edge.
+    last_change: int | None
+
+    #: The most recently seen level.
+    level: int | None
+
+class EdgeDebounce(APipeline[int, int | tuple[int, int]]):
+    """Pipeline that debounces a digital input from its edges.
+
+    Values are either levels, or (ticks_us, level) tuples of an edge such as
+    those from a BufferedPinInterrupt.  A level is only emitted once there
+    have been no edges for the settle time, and only if it differs from the
+    last stable level.
+    """
+
+    flow: type[EdgeDebounceFlow] = EdgeDebounceFlow
+
+    #: The time without edges required to confirm a level in microseconds.
+    settle: int
+
+    #: The last confirmed level, or None.
+    state: int | None
+
+    def __init__(
+        self,
+        settle: float = 0.005,
+        source: ASource[int | tuple[int, int]] | None = None,
+    ): ...
+
+    async def __call__(self, value: int | tuple[int, int] | None = None) -> int | None:
+        """Get the confirmed level or the source's current level, or pass an edge."""
+
+    def __ror__(self, other: ASource[int | tuple[int, int]]) -> EdgeDebounce: ...
+
 class DedupFlow(APipelineFlow[Returned, Returned]):
 
     flow: AFlow[Returned]
@@ -90,6 +250,8 @@ class Dedup(APipeline[Returned, Returned]):
 class EWMA(APipeline[float, float]):
     """Pipeline that smoothes values with an exponentially weighted moving average."""
 
+    synchronous: bool = True
+
     #: The weight to apply to the new value.
     weight: float
 
@@ -100,8 +262,468 @@ class EWMA(APipeline[float, float]):
         self, weight: float = 0.5, source: ASource[float] | None = None
     ): ...
 
+    def process(self, value: float) -> float: ...
+
     def __ror__(self, other: ASource[float]) -> Self: ...
 
+class FixedEWMA(APipeline[int, int]):
+    """Pipeline that smoothes integer values without floating point arithmetic.
+
+    This is an exponentially weighted moving average with a weight of
+    1/2**shift, computed on an accumulator which holds the average scaled
+    by 2**shift, so the values stay as small integers.
+    """
+
+    synchronous: bool = True
+
+    #: The weight of a new value is 1/2**shift.
+    shift: int
+
+    #: The running average scaled by 2**shift.
+    accumulator: int | None
+
+    def __init__(self, shift: int = 1, source: ASource[int] | None = None): ...
+
+    def process(self, value: int) -> int: ...
+
+    def __ror__(self, other: ASource[int]) -> Self: ...
+
+class Window(APipeline[float, float]):
+    """Base class for pipelines that compute statistics of recent values.
+
+    The most recent values are held in a preallocated array which is used
+    as a ring buffer, so processing a value doesn't allocate memory.
+    """
+
+    synchronous: bool = True
+
+    #: The number of values in the window.
+    size: int
+
+    #: The array typecode of the stored values.
+    typecode: str
+
+    #: The ring buffer of recent values.
+    values: array
+
+    #: The position where the next value will be stored.
+    index: int
+
+    #: The number of values currently in the window.
+    count: int
+
+    def __init__(
+        self, size: int = 8, typecode: str = "f", source: ASource[float] | None = None
+    ): ...
+
+    def push(self, value: float) -> float | None:
+        """Store a value in the ring buffer, returning the value it replaces."""
+
+    def process(self, value: float) -> float: ...
+
+    def __ror__(self, other: ASource[float]) -> Self: ...
+
+class MovingAverage(Window):
+    """Pipeline that emits the mean of the most recent values."""
+
+    #: The running sum of the values in the window.
+    total: float
+
+class MovingMin(Window):
+    """Pipeline that emits the minimum of the most recent values.
+
+    The positions of candidate values are kept in a monotonic queue, so each
+    value is only compared with the candidates it supersedes.
+    """
+
+    #: The ring buffer of positions of candidate values.
+    queue: array
+
+    #: The position in the queue of the current result.
+    head: int
+
+    #: The number of candidates in the queue.
+    length: int
+
+    def supersedes(self, value: float, candidate: float) -> bool:
+        """Whether a new value means an older candidate can't be the result."""
+
+class MovingMax(MovingMin):
+    """Pipeline that emits the maximum of the most recent values."""
+
+class Median(Window):
+    """Pipeline that emits the median of the most recent values.
+
+    A sorted copy of the window is updated in place as each value arrives,
+    which makes this effective at removing spikes from noisy sensors.
+    """
+
+    #: The values in the window in sorted order.
+    ordered: array
+
+    def __init__(
+        self, size: int = 5, typecode: str = "f", source: ASource[float] | None = None
+    ): ...
+
+class BatchFlow(APipelineFlow[Sequence[Returned], Returned]):
+    """Flow which collects values from the source into batches.
+
+    If the batch has a timeout, a task consumes the upstream flow into the
+    buffer so that a partial batch can be emitted on time even when the
+    source stalls.
+    """
+
+    flow: AFlow[Returned]
+
+    #: The preallocated buffer that batches are collected in.
+    buffer: list[Returned] | array
+
+    #: The number of values in the current batch.
+    count: int
+
+    #: The millisecond ticks when the first value of the batch arrived.
+    start: int | None
+
+    #: Whether the consumer is still using a full buffer.
+    held: bool
+
+    #: Whether the upstream flow is exhausted.
+    closed: bool
+
+    #: The task consuming the upstream flow, or None.
+    task: uasyncio.Task | None
+
+    #: An uasyncio Event which is set when a value is added to the buffer.
+    event: uasyncio.Event
+
+    #: An uasyncio Event which is set when there is space in the buffer.
+    space: uasyncio.Event
+
+    async def pump(self) -> None:
+        """Consume the upstream flow into the buffer."""
+
+    def close(self) -> None:
+        """Stop consuming the upstream flow."""
+
+    def take(self) -> Sequence[Returned]:
+        """Emit the values in the buffer, starting a new batch."""
+
+    async def collect(self) -> Sequence[Returned]:
+        """Collect a batch directly from the upstream flow."""
+
+class Batch(APipeline[Sequence[Returned], Returned]):
+    """Pipeline that collects values into fixed-size batches.
+
+    Each flow holds a preallocated buffer, either a list or an array with the
+    given typecode, which it fills and emits when it is full.  The same buffer
+    is reused for the next batch, so consumers must process a batch before
+    requesting another.  If a timeout is given, a shorter batch is emitted
+    once that many seconds have passed since the first value of the batch
+    arrived, even if the source has stalled.
+    """
+
+    flow: type[BatchFlow[Returned]] = BatchFlow
+
+    #: The number of values in a full batch.
+    size: int
+
+    #: The timeout for a partial batch in milliseconds, or None.
+    timeout: float | None
+
+    #: The array typecode of the batch buffer, or None for a list.
+    typecode: str | None
+
+    def __init__(
+        self,
+        size: int = 32,
+        timeout: float | None = None,
+        typecode: str | None = None,
+        source: ASource[Returned] | None = None,
+    ): ...
+
+    def __ror__(self, other: ASource[Returned]) -> Batch[Returned]: ...
+
+class BatchApply(APipeline[list[Returned], Sequence[Consumed]]):
+    """Pipeline that applies a function to each value of a batch."""
+
+    synchronous: bool = True
+
+    function: Callable[[Consumed], Returned]
+
+    args: tuple[Any, ...]
+
+    kwargs: dict[str, Any]
+
+    def __init__(
+        self,
+        function: Callable[[Consumed], Returned],
+        args: tuple[Any, ...] = (),
+        kwargs: dict[str, Any] = {},
+        source: ASource[Sequence[Consumed]] | None = None,
+    ): ...
+
+    def process(self, batch: Sequence[Consumed]) -> list[Returned]: ...
+
+    def __ror__(self, other: ASource[Sequence[Consumed]]) -> BatchApply[Returned, Consumed]: ...
+
+class BatchFilter(APipeline[list[Returned], Sequence[Returned]]):
+    """Pipeline that filters the values of a batch."""
+
+    synchronous: bool = True
+
+    filter: Callable[[Returned], bool]
+
+    args: tuple[Any, ...]
+
+    kwargs: dict[str, Any]
+
+    def __init__(
+        self,
+        filter: Callable[[Returned], bool],
+        args: tuple[Any, ...] = (),
+        kwargs: dict[str, Any] = {},
+        source: ASource[Sequence[Returned]] | None = None,
+    ): ...
+
+    def process(self, batch: Sequence[Returned]) -> list[Returned] | None: ...
+
+    def __ror__(self, other: ASource[Sequence[Returned]]) -> BatchFilter[Returned]: ...
+
+class BatchEWMA(APipeline[list[float], Sequence[float]]):
+    """Pipeline that smoothes the values of a batch with an EWMA."""
+
+    synchronous: bool = True
+
+    #: The weight to apply to each new value.
+    weight: float
+
+    #: The last weighted value.
+    value: float | None
+
+    def __init__(
+        self, weight: float = 0.5, source: ASource[Sequence[float]] | None = None
+    ): ...
+
+    def process(self, batch: Sequence[float]) -> list[float]: ...
+
+    def __ror__(self, other: ASource[Sequence[float]]) -> Self: ...
+
+class BatchDedup(APipeline[list[Returned], Sequence[Returned]]):
+    """Pipeline that removes repeated values from a batch."""
+
+    synchronous: bool = True
+
+    #: The last value seen.
+    value: Returned | None
+
+    def __init__(self, source: ASource[Sequence[Returned]] | None = None): ...
+
+    def process(self, batch: Sequence[Returned]) -> list[Returned] | None: ...
+
+    def __ror__(self, other: ASource[Sequence[Returned]]) -> BatchDedup[Returned]: ...
+
+class BufferFlow(AFlow[Returned]):
+    """Flow which takes values from a Buffer."""
+
+    source: "Buffer[Returned]"
+
+class Buffer(APipeline[Returned, Returned]):
+    """Pipeline that decouples a source from its consumer with a ring buffer.
+
+    A task consumes the source and adds values to a preallocated buffer,
+    which the flow removes them from.  When the buffer is full, the policy
+    determines whether the oldest value is dropped (DROP_OLDEST), the new
+    value is dropped (DROP_NEWEST), or the producer waits for space (BLOCK).
+    """
+
+    flow: type[BufferFlow[Returned]] = BufferFlow
+
+    #: The maximum number of buffered values.
+    size: int
+
+    #: The overflow policy.
+    policy: int
+
+    #: The preallocated ring buffer of values.
+    values: list[Returned | None]
+
+    #: The index of the oldest buffered value.
+    start: int
+
+    #: The number of buffered values.
+    count: int
+
+    #: The number of values dropped due to overflow.
+    dropped: int
+
+    #: The largest number of values which have been buffered at once.
+    high_water: int
+
+    #: Whether the source has been exhausted.
+    closed: bool
+
+    #: The task consuming the source, or None.
+    task: uasyncio.Task | None
+
+    #: An uasyncio Event which is set when a value is added.
+    not_empty: uasyncio.Event
+
+    #: An uasyncio Event which is set when a value is removed.
+    not_full: uasyncio.Event
+
+    def __init__(
+        self,
+        size: int = 16,
+        policy: int = DROP_OLDEST,
+        source: ASource[Returned] | None = None,
+    ): ...
+
+    async def __call__(self, value: Returned | None = None) -> Returned | None:
+        """Add a value to the buffer, or get the oldest buffered value."""
+
+    async def put(self, value: Returned) -> None:
+        """Add a value to the buffer, applying the policy if it is full."""
+
+    def get(self) -> Returned | None:
+        """Remove and return the oldest value, or None if the buffer is empty."""
+
+    async def run(self) -> None:
+        """Consume the source, adding values to the buffer."""
+
+    def close(self) -> None:
+        """Stop the flow once the buffered values have been consumed."""
+
+    def __ror__(self, other: ASource[Returned]) -> Buffer[Returned]: ...
+
+class Deadband(APipeline[float, float]):
+    """Pipeline that ignores values close to the last value emitted.
+
+    A value is emitted only when it has risen or fallen from the last
+    emitted value by more than a threshold.  The threshold may be scaled by
+    the last value, and rising and falling values can have separate
+    thresholds to give hysteresis.
+    """
+
+    synchronous: bool = True
+
+    #: The change above the last emitted value needed to emit a value.
+    rising: float
+
+    #: The change below the last emitted value needed to emit a value.
+    falling: float
+
+    #: A fraction of the last emitted value to use if it exceeds the thresholds.
+    relative: float | None
+
+    #: The last emitted value.
+    value: float | None
+
+    def __init__(
+        self,
+        threshold: float = 0,
+        relative: float | None = None,
+        rising: float | None = None,
+        falling: float | None = None,
+        source: ASource[float] | None = None,
+    ): ...
+
+    def process(self, value: float) -> float | None: ...
+
+    def __ror__(self, other: ASource[float]) -> Self: ...
+
+class Cache(APipeline[Returned, Returned]):
+    """Pipeline that reuses the source's value for a short time.
+
+    Calling the pipeline returns the last value obtained from the source if
+    it is less than ttl seconds old, rather than calling the source again.
+    Values passing through the pipeline's flow also refresh the cache.
+    """
+
+    #: The time-to-live of a cached value in milliseconds.
+    ttl: float
+
+    #: The cached value.
+    value: Returned | None
+
+    #: The millisecond ticks when the cached value was obtained, or None.
+    last_update: int | None
+
+    #: The number of calls answered from the cache.
+    hits: int
+
+    #: The number of calls which needed a new value.
+    misses: int
+
+    def __init__(self, ttl: float = 0.005, source: ASource[Returned] | None = None): ...
+
+    async def __call__(self, value: Returned | None = None) -> Returned | None:
+        """Get a cached or new value from the source, or cache a value."""
+
+    def __ror__(self, other: ASource[Returned]) -> Cache[Returned]: ...
+
+class Unpack(APipeline[tuple[Any, ...], bytes | bytearray | memoryview]):
+    """Pipeline that decodes binary records with a struct format.
+
+    Each value is a buffer, such as a memoryview of a frame, which is
+    decoded from the given offset without copying.  If field names are
+    given, values are emitted as named tuples, otherwise as tuples.  Buffers
+    which are too short are dropped and counted in the errors attribute.
+    """
+
+    synchronous: bool = True
+
+    #: The struct format of the records.
+    format: str
+
+    #: The size of a record in bytes.
+    size: int
+
+    #: The offset of the record in each buffer.
+    offset: int
+
+    #: The named tuple type of the records, or None for plain tuples.
+    record: type[tuple[Any, ...]] | None
+
+    #: The number of buffers which were too short to decode.
+    errors: int
+
+    def __init__(
+        self,
+        format: str,
+        fields: str | Sequence[str] | None = None,
+        offset: int = 0,
+        source: ASource[bytes | bytearray | memoryview] | None = None,
+    ): ...
+
+    def process(self, buffer: bytes | bytearray | memoryview) -> tuple[Any, ...] | None: ...
+
+    def __ror__(self, other: ASource[bytes | bytearray | memoryview]) -> Self: ...
+
+class Pack(APipeline[memoryview, Any]):
+    """Pipeline that encodes values as binary records with a struct format.
+
+    Values are tuples, or single values for one-field formats, which are
+    packed into a reused buffer.  Each emitted value is a memoryview of the
+    buffer, which is only valid until the next value is packed.
+    """
+
+    synchronous: bool = True
+
+    #: The struct format of the records.
+    format: str
+
+    #: The buffer that records are packed into.
+    buffer: bytearray
+
+    #: A memoryview of the buffer.
+    view: memoryview
+
+    def __init__(self, format: str, source: ASource[Any] | None = None): ...
+
+    def process(self, value: Any) -> memoryview: ...
+
+    def __ror__(self, other: ASource[Any]) -> Self: ...
+
 def pipe(
     fn: Callable[Concatenate[Consumed, P], Returned]
 ) -> Callable[P, Apply[Returned, Consumed]]: ...
@@ -5,9 +5,13 @@
 """Polling source classes and decorators."""
 
 import uasyncio
+import utime
 
 from .core import AFlow, ASource, asynchronize
 
+SKIP = 0
+BURST = 1
+
 
 class PollFlow(AFlow):
     """Iterator for Poll sources"""
@@ -17,25 +21,186 @@ class PollFlow(AFlow):
         return await super().__anext__()
 
 
+class FixedRatePollFlow(AFlow):
+    """Iterator for Poll sources which polls at fixed deadlines.
+
+    Each deadline is a whole number of intervals after the first, so time
+    spent in the callback and the scheduler does not accumulate as drift.
+    If the flow falls more than an interval behind, the SKIP policy skips
+    the missed deadlines, while the BURST policy polls without waiting until
+    it has caught up.
+    """
+
+    def __init__(self, source):
+        super().__init__(source)
+        self.period = int(source.interval * 1000000)
+        self.deadline = None
+        self.lateness = 0
+        self.max_lateness = 0
+        self.missed = 0
+
+    async def __anext__(self):
+        period = self.period
+        now = utime.ticks_us()
+        if self.deadline is None:
+            self.deadline = utime.ticks_add(now, period)
+        else:
+            self.deadline = utime.ticks_add(self.deadline, period)
+
+        delay = utime.ticks_diff(self.deadline, now)
+        if delay > 0:
+            await uasyncio.sleep_ms((delay + 500) // 1000)
+        elif self.source.catch_up == SKIP and -delay >= period:
+            missed = -delay // period
+            self.deadline = utime.ticks_add(self.deadline, missed * period)
+            self.missed += missed
+
+        self.lateness = max(0, utime.ticks_diff(utime.ticks_us(), self.deadline))
+        if self.lateness > self.max_lateness:
+            self.max_lateness = self.lateness
+        return await super().__anext__()
+
+
+class AdaptivePollFlow(AFlow):
+    """Iterator for Poll sources which backs off while the value is unchanged.
+
+    The interval is multiplied by the source's backoff factor each time the
+    polled value is the same as the previous one, up to the source's maximum
+    interval, and returns to the source's interval when the value changes.
+    """
+
+    def __init__(self, source):
+        super().__init__(source)
+        self.interval = source.interval
+        self.value = None
+
+    async def __anext__(self):
+        await uasyncio.sleep(self.interval)
+        value = await super().__anext__()
+        if value == self.value:
+            source = self.source
+            self.interval = min(self.interval * source.backoff, source.max_interval)
+        else:
+            self.interval = self.source.interval
+            self.value = value
+        return value
+
+
 class Poll(ASource):
     """Source that calls a coroutine periodically."""
 
     flow = PollFlow
 
-    def __init__(self, coroutine, interval):
+    def __init__(
+        self,
+        coroutine,
+        interval,
+        fixed_rate=False,
+        catch_up=SKIP,
+        max_interval=None,
+        backoff=2,
+    ):
         self.coroutine = coroutine
         self.interval = interval
+        self.catch_up = catch_up
+        self.max_interval = max_interval
+        self.backoff = backoff
+        if max_interval is not None:
+            if fixed_rate:
+                raise ValueError("Adaptive polling can't be used at a fixed rate.")
+            self.flow = AdaptivePollFlow
+        elif fixed_rate:
+            self.flow = FixedRatePollFlow
 
     async def __call__(self):
         value = await self.coroutine()
         return value
 
 
+class PollScheduler:
+    """Drive the sinks of many polled sources from a single task.
+
+    Sinks are grouped by their polling interval, and every sink in a group
+    is called at the same fixed-rate deadline, so one task and one sleep
+    serve all of the registered sinks.  Each sink is called without a value,
+    so it consumes the current value of its source.
+    """
+
+    def __init__(self):
+        self.groups = []
+        self.task = None
+        self.wake = uasyncio.Event()
+
+    def add(self, sink, interval=None):
+        """Add a sink, polling at the interval of its Poll source by default."""
+        if interval is None:
+            source = sink.source
+            while source is not None and not isinstance(source, Poll):
+                source = getattr(source, "source", None)
+            if source is None:
+                raise ValueError("Sink has no Poll source, an interval is required.")
+            interval = source.interval
+        period = int(interval * 1000000)
+        for group in self.groups:
+            if group[0] == period:
+                group[2].append(sink)
+                return
+        self.groups.append([period, utime.ticks_add(utime.ticks_us(), period), [sink]])
+        self.wake.set()
+
+    def remove(self, sink):
+        """Stop calling a sink."""
+        for group in self.groups:
+            if sink in group[2]:
+                group[2].remove(sink)
+                if not group[2]:
+                    self.groups.remove(group)
+                return
+
+    async def run(self):
+        """Call the sinks of each group when their deadline is reached."""
+        try:
+            while True:
+                for group in self.groups:
+                    period, deadline, sinks = group
+                    if utime.ticks_diff(deadline, utime.ticks_us()) <= 0:
+                        for sink in sinks:
+                            await sink()
+                        deadline = utime.ticks_add(deadline, period)
+                        late = utime.ticks_diff(utime.ticks_us(), deadline)
+                        if late >= 0:
+                            # skip deadlines which have already been missed
+                            deadline = utime.ticks_add(deadline, (late // period + 1) * period)
+                        group[1] = deadline
+
+                self.wake.clear()
+                if not self.groups:
+                    await self.wake.wait()
+                    continue
+
+                now = utime.ticks_us()
+                delay = min(utime.ticks_diff(group[1], now) for group in self.groups)
+                if delay > 0:
+                    try:
+                        await uasyncio.wait_for_ms(self.wake.wait(), (delay + 500) // 1000)
+                    except uasyncio.TimeoutError:
+                        pass
+                else:
+                    await uasyncio.sleep_ms(0)
+        except uasyncio.CancelledError:
+            return
+
+    def create_task(self):
+        """Create a task that runs the scheduler."""
+        self.task = uasyncio.create_task(self.run())
+        return self.task
+
+
 def poll(callback):
     """Decorator that creates a Poll source from a callback."""
 
-    def decorator(interval):
-        return Poll(asynchronize(callback), interval)
+    def decorator(interval, **kwargs):
+        return Poll(asynchronize(callback), interval, **kwargs)
 
     return decorator
 
@@ -43,7 +208,7 @@ def poll(callback):
 def apoll(coroutine):
     """Decorator that creates a Poll source from a callback."""
 
-    def decorator(interval):
-        return Poll(coroutine, interval)
+    def decorator(interval, **kwargs):
+        return Poll(coroutine, interval, **kwargs)
 
     return decorator
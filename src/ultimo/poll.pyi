@@ -4,7 +4,15 @@
 
 from typing import Any, Callable, Coroutine
 
-from .core import AFlow, ASource, Returned, asynchronize
+import uasyncio
+
+from .core import AFlow, ASink, ASource, Returned, asynchronize
+
+#: Catch-up policy which skips deadlines that have been missed.
+SKIP: int
+
+#: Catch-up policy which polls without waiting until caught up.
+BURST: int
 
 class PollFlow(AFlow[Returned]):
 
@@ -13,20 +21,116 @@ class PollFlow(AFlow[Returned]):
     def __init__(self, source: "Poll") -> None: ...
     async def __anext__(self) -> Returned: ...
 
+class FixedRatePollFlow(AFlow[Returned]):
+    """Iterator for Poll sources which polls at fixed deadlines.
+
+    Each deadline is a whole number of intervals after the first, so time
+    spent in the callback and the scheduler does not accumulate as drift.
+    If the flow falls more than an interval behind, the SKIP policy skips
+    the missed deadlines, while the BURST policy polls without waiting until
+    it has caught up.
+    """
+
+    source: "Poll"
+
+    #: The polling interval in microseconds.
+    period: int
+
+    #: The ticks_us of the current deadline, or None before the first poll.
+    deadline: int | None
+
+    #: How late the most recent poll was in microseconds.
+    lateness: int
+
+    #: The greatest lateness seen in microseconds.
+    max_lateness: int
+
+    #: The number of deadlines skipped by the SKIP policy.
+    missed: int
+
+    def __init__(self, source: "Poll") -> None: ...
+    async def __anext__(self) -> Returned: ...
+
+class AdaptivePollFlow(AFlow[Returned]):
+    """Iterator for Poll sources which backs off while the value is unchanged.
+
+    The interval is multiplied by the source's backoff factor each time the
+    polled value is the same as the previous one, up to the source's maximum
+    interval, and returns to the source's interval when the value changes.
+    """
+
+    source: "Poll"
+
+    #: The current polling interval in seconds.
+    interval: float
+
+    #: The previous polled value.
+    value: Returned | None
+
+    def __init__(self, source: "Poll") -> None: ...
+    async def __anext__(self) -> Returned: ...
+
 class Poll(ASource[Returned]):
 
     flow: type[AFlow] = PollFlow
 
     interval: float
 
+    #: The policy for catching up missed deadlines when polling at a fixed rate.
+    catch_up: int
+
+    #: The longest interval for adaptive polling, or None.
+    max_interval: float | None
+
+    #: The factor to increase the interval by while the value is unchanged.
+    backoff: float
+
     callback: Callable[[], Coroutine[Any, Any, Returned]]
 
     def __init__(
         self,
         callback: Callable[[], Coroutine[Any, Any, Returned]],
         interval: float,
+        fixed_rate: bool = False,
+        catch_up: int = SKIP,
+        max_interval: float | None = None,
+        backoff: float = 2,
     ) -> None: ...
 
+class PollScheduler:
+    """Drive the sinks of many polled sources from a single task.
+
+    Sinks are grouped by their polling interval, and every sink in a group
+    is called at the same fixed-rate deadline, so one task and one sleep
+    serve all of the registered sinks.  Each sink is called without a value,
+    so it consumes the current value of its source.
+    """
+
+    #: The groups of sinks as [period_us, deadline_ticks_us, sinks] lists.
+    groups: list[list[Any]]
+
+    #: The task running the scheduler, or None.
+    task: uasyncio.Task | None
+
+    #: An uasyncio Event which is set to wake the scheduler when a group is added.
+    wake: uasyncio.Event
+
+    def add(self, sink: ASink[Any], interval: float | None = None) -> None:
+        """Add a sink, polling at the interval of its Poll source by default."""
+
+    def remove(self, sink: ASink[Any]) -> None:
+        """Stop calling a sink."""
+
+    async def run(self) -> None:
+        """Call the sinks of each group when their deadline is reached."""
+
+    def create_task(self) -> uasyncio.Task:
+        """Create a task that runs the scheduler."""
+
 def poll(
     callback: Callable[[], Returned]
-) -> Callable[[float], Coroutine[Any, Any, Returned]]: ...
+) -> Callable[..., Poll[Returned]]: ...
+
+def apoll(
+    coroutine: Callable[[], Coroutine[Any, Any, Returned]]
+) -> Callable[..., Poll[Returned]]: ...
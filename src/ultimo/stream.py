@@ -2,11 +2,16 @@
 #
 # SPDX-License-Identifier: MIT
 
+import struct
 import sys
 
 import uasyncio
 
 from .core import ASink, ASource
+from .pipelines import DROP_NEWEST, DROP_OLDEST, Buffer
+
+#: Slow client policy which disconnects a client whose queue is full.
+DISCONNECT = 3
 
 
 class StreamMixin:
@@ -36,19 +41,138 @@ class AWrite(ASink, StreamMixin):
         self.stream.write(source_value)
         await self.stream.drain()
 
+    async def flush(self):
+        """Drain any data written to the stream."""
+        await self.stream.drain()
+
+
+class ABufferedWrite(AWrite):
+    """Write to a stream asynchronously, coalescing writes.
+
+    Written data is gathered in a preallocated buffer of threshold bytes and
+    written to the stream in one call once the latency has passed (by
+    default at the next tick of the event loop) or once the buffer is full,
+    whichever is first.  Text is encoded as UTF-8.
+    """
+
+    def __init__(self, stream=sys.stdout, latency=0, threshold=256, source=None):
+        super().__init__(stream, source)
+        self.latency = int(latency * 1000)
+        self.threshold = threshold
+        self.buffer = bytearray(threshold)
+        self.view = memoryview(self.buffer)
+        self.pending = 0
+        self.flush_task = None
+        self.lock = uasyncio.Lock()
+
+    async def process(self, source_value):
+        """Add data to the buffer, flushing if the buffer is full."""
+        if isinstance(source_value, str):
+            source_value = source_value.encode()
+        length = len(source_value)
+        if self.pending + length > self.threshold:
+            await self.flush()
+            if length > self.threshold:
+                # too big to buffer, so write it directly
+                async with self.lock:
+                    self.stream.write(source_value)
+                    await self.stream.drain()
+                return
+        self.view[self.pending:self.pending + length] = source_value
+        self.pending += length
+        if self.pending >= self.threshold:
+            await self.flush()
+        elif self.flush_task is None:
+            self.flush_task = uasyncio.create_task(self.delayed_flush())
+
+    async def delayed_flush(self):
+        """Flush the buffer once the latency has passed."""
+        try:
+            await uasyncio.sleep_ms(self.latency)
+        except uasyncio.CancelledError:
+            return
+        self.flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        """Write any buffered data to the stream and drain."""
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        # only one drain of a stream may be waiting at a time
+        async with self.lock:
+            if self.pending:
+                self.stream.write(self.view[:self.pending])
+                self.pending = 0
+            await self.stream.drain()
+
+    async def run(self):
+        """Consume the source if available, then drain the stream."""
+        await super().run()
+        await self.flush()
+
+    async def close(self):
+        """Drain and close the output stream."""
+        await self.flush()
+        await super().close()
+
 
 class ARead(ASource, StreamMixin):
-    """Read from a stream asynchronously one character at a time."""
+    """Read from a stream asynchronously one character at a time.
 
-    def __init__(self, stream=sys.stdin):
+    If chunk_size is given, up to that many characters that are available
+    are read at once and then emitted one at a time without waiting.  This
+    needs a stream whose reads return what is available, such as a UART or
+    socket, so it can't be used with standard input, whose reads block until
+    they are filled.
+    """
+
+    def __init__(self, stream=sys.stdin, chunk_size=None):
+        if chunk_size is not None and stream is sys.stdin:
+            raise ValueError("Standard input can't be read in chunks.")
         self.stream = uasyncio.StreamReader(stream)
+        self.chunk_size = chunk_size
+        self.chunk = ""
+        self.index = 0
 
     async def __call__(self):
-        value = await self.stream.read(1)
-        if value == "":
+        if self.chunk_size is None:
+            value = await self.stream.read(1)
+            if value == "":
+                # Stop iteration
+                return None
+            return value
+
+        index = self.index
+        if index >= len(self.chunk):
+            self.chunk = await self.stream.read(self.chunk_size)
+            index = 0
+            if not self.chunk:
+                # Stop iteration
+                return None
+        self.index = index + 1
+        return self.chunk[index:index + 1]
+
+
+class AReadInto(ASource, StreamMixin):
+    """Read chunks from a binary stream into a reusable buffer.
+
+    Each value is a memoryview of the bytes read, which is only valid until
+    the next read, so copy it if it needs to be kept.  The stream's reads
+    must return what is available, as a UART or socket does.
+    """
+
+    def __init__(self, stream, size=256):
+        self.stream = uasyncio.StreamReader(stream)
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+
+    async def __call__(self):
+        count = await self.stream.readinto(self.buffer)
+        if not count:
             # Stop iteration
             return None
-        return value
+        return self.view[:count]
 
 
 class AReadline(ASource, StreamMixin):
@@ -63,3 +187,368 @@ class AReadline(ASource, StreamMixin):
             # Stop iteration
             return None
         return value
+
+
+class AReadlineInto(ASource, StreamMixin):
+    """Read lines from a binary stream into a reusable buffer.
+
+    Each value is a memoryview of a line, including its newline, which is
+    only valid until the next line is read.  Lines longer than max_length
+    are either truncated to max_length bytes or skipped, and are counted.
+    The stream's reads must return what is available, as a UART or socket
+    does.
+    """
+
+    def __init__(self, stream, max_length=128, truncate=True, chunk_size=64):
+        self.stream = uasyncio.StreamReader(stream)
+        self.truncate = truncate
+        self.line = bytearray(max_length)
+        self.view = memoryview(self.line)
+        self.chunk = bytearray(chunk_size)
+        self.start = 0
+        self.end = 0
+        self.truncated = 0
+        self.errors = 0
+
+    async def __call__(self):
+        line = self.line
+        chunk = self.chunk
+        max_length = len(line)
+        length = 0
+        overlong = False
+        while True:
+            if self.start >= self.end:
+                count = await self.stream.readinto(chunk)
+                self.start = 0
+                self.end = count or 0
+                if not count and length == 0 and not overlong:
+                    # Stop iteration
+                    return None
+            start = self.start
+            end = self.end
+            # an empty read ends an unterminated last line
+            ended = end == 0
+            # copy a byte at a time to avoid allocating slices
+            while start < end:
+                byte = chunk[start]
+                start += 1
+                if length < max_length:
+                    line[length] = byte
+                    length += 1
+                else:
+                    overlong = True
+                if byte == 10:
+                    ended = True
+                    break
+            self.start = start
+            if not ended:
+                continue
+            if overlong:
+                if self.truncate:
+                    self.truncated += 1
+                else:
+                    # skip the line and read the next one
+                    self.errors += 1
+                    length = 0
+                    overlong = False
+                    continue
+            return self.view[:length]
+
+
+class AReadFrames(AReadInto):
+    """Base class for sources which decode binary frames from a stream.
+
+    Data is read in chunks and passed a byte at a time to the feed method,
+    which decodes it into a preallocated frame buffer.  Each value is a
+    memoryview of a complete frame, which is only valid until the next frame
+    is read.  Corrupt or overlong frames are discarded and counted in the
+    errors attribute, and decoding resynchronizes at the next frame boundary.
+    """
+
+    def __init__(self, stream, max_length=256, chunk_size=64):
+        super().__init__(stream, chunk_size)
+        self.frame = bytearray(max_length)
+        self.frame_view = memoryview(self.frame)
+        self.start = 0
+        self.end = 0
+        self.length = 0
+        self.discarding = False
+        self.errors = 0
+
+    def feed(self, byte):
+        """Decode a byte, returning True when a frame is complete.
+
+        Subclasses must override.
+        """
+        raise NotImplementedError()
+
+    def reset(self):
+        """Prepare to decode a new frame."""
+        self.length = 0
+        self.discarding = False
+
+    def store(self, byte):
+        """Append a decoded byte to the frame, discarding it if it is too long."""
+        if self.length < len(self.frame):
+            self.frame[self.length] = byte
+            self.length += 1
+        else:
+            self.error()
+
+    def error(self):
+        """Discard the current frame until the next frame boundary."""
+        self.errors += 1
+        self.length = 0
+        self.discarding = True
+
+    async def __call__(self):
+        buffer = self.buffer
+        while True:
+            if self.start >= self.end:
+                count = await self.stream.readinto(buffer)
+                if not count:
+                    # Stop iteration
+                    return None
+                self.start = 0
+                self.end = count
+            start = self.start
+            end = self.end
+            while start < end:
+                byte = buffer[start]
+                start += 1
+                if self.feed(byte):
+                    self.start = start
+                    length = self.length
+                    self.reset()
+                    return self.frame_view[:length]
+            self.start = start
+
+
+class AReadLengthPrefixed(AReadFrames):
+    """Read frames which are preceded by their length.
+
+    The length is encoded with the struct format given by header, by default
+    a single unsigned byte.  Frames longer than max_length are skipped.
+    """
+
+    def __init__(self, stream, max_length=256, header="B", chunk_size=64):
+        super().__init__(stream, max_length, chunk_size)
+        self.header_format = header
+        self.header = bytearray(struct.calcsize(header))
+        self.header_count = 0
+        self.expected = 0
+
+    def reset(self):
+        super().reset()
+        self.header_count = 0
+        self.expected = 0
+
+    def feed(self, byte):
+        header = self.header
+        if self.header_count < len(header):
+            header[self.header_count] = byte
+            self.header_count += 1
+            if self.header_count < len(header):
+                return False
+            self.expected = struct.unpack_from(self.header_format, header)[0]
+            if self.expected > len(self.frame):
+                self.error()
+            return self.expected == 0
+        if self.discarding:
+            # skip the body of an overlong frame
+            self.length += 1
+            if self.length == self.expected:
+                self.reset()
+            return False
+        self.store(byte)
+        return self.length == self.expected
+
+
+#: The COBS frame delimiter.
+COBS_DELIMITER = 0x00
+
+
+class AReadCOBS(AReadFrames):
+    """Read frames encoded with Consistent Overhead Byte Stuffing.
+
+    Frames are separated by zero bytes.
+    """
+
+    def __init__(self, stream, max_length=256, chunk_size=64):
+        super().__init__(stream, max_length, chunk_size)
+        self.code = 0
+        self.remaining = 0
+
+    def reset(self):
+        super().reset()
+        self.code = 0
+        self.remaining = 0
+
+    def feed(self, byte):
+        if byte == COBS_DELIMITER:
+            if self.discarding or (self.code == 0 and self.length == 0):
+                self.reset()
+                return False
+            if self.remaining:
+                # the frame ended part way through a block
+                self.error()
+                self.reset()
+                return False
+            return True
+        if self.discarding:
+            return False
+        if self.remaining:
+            self.store(byte)
+            self.remaining -= 1
+        else:
+            # a new block: the previous short block implies a zero byte
+            if self.code and self.code < 0xFF:
+                self.store(0)
+            self.code = byte
+            self.remaining = byte - 1
+        return False
+
+
+#: The SLIP frame delimiter.
+SLIP_END = 0xC0
+
+#: The SLIP escape byte.
+SLIP_ESC = 0xDB
+
+#: The escaped form of SLIP_END.
+SLIP_ESC_END = 0xDC
+
+#: The escaped form of SLIP_ESC.
+SLIP_ESC_ESC = 0xDD
+
+
+class AReadSLIP(AReadFrames):
+    """Read frames encoded with the Serial Line Internet Protocol."""
+
+    def __init__(self, stream, max_length=256, chunk_size=64):
+        super().__init__(stream, max_length, chunk_size)
+        self.escaped = False
+
+    def reset(self):
+        super().reset()
+        self.escaped = False
+
+    def feed(self, byte):
+        if byte == SLIP_END:
+            if self.discarding or self.length == 0:
+                self.reset()
+                return False
+            if self.escaped:
+                self.error()
+                self.reset()
+                return False
+            return True
+        if self.discarding:
+            return False
+        if self.escaped:
+            self.escaped = False
+            if byte == SLIP_ESC_END:
+                self.store(SLIP_END)
+            elif byte == SLIP_ESC_ESC:
+                self.store(SLIP_ESC)
+            else:
+                self.error()
+        elif byte == SLIP_ESC:
+            self.escaped = True
+        else:
+            self.store(byte)
+        return False
+
+
+class ABroadcastServer(ASink, StreamMixin):
+    """Sink which sends values to every client connected to a TCP server.
+
+    Each client has a bounded queue which a task per client sends to the
+    client, coalescing queued values into a single drain.  When a client's
+    queue is full the policy determines whether the oldest value is dropped
+    (DROP_OLDEST), the new value is dropped (DROP_NEWEST), or the client is
+    disconnected (DISCONNECT), so a slow client never holds up the source.
+    Any other policy raises a ValueError.
+
+    Text is sent encoded as UTF-8 and buffers are sent as-is, while any other
+    value, such as a number, is sent as a line of text.
+    """
+
+    def __init__(self, host="0.0.0.0", port=8000, queue_size=16, policy=DROP_OLDEST, source=None):
+        if policy not in (DROP_OLDEST, DROP_NEWEST, DISCONNECT):
+            raise ValueError("Policy must be DROP_OLDEST, DROP_NEWEST or DISCONNECT.")
+        super().__init__(source)
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.policy = policy
+        self.clients = {}
+        self.server = None
+        self.disconnects = 0
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def start(self):
+        """Start listening for clients."""
+        if self.server is None:
+            self.server = await uasyncio.start_server(self.serve, self.host, self.port)
+
+    async def serve(self, reader, writer):
+        """Send queued values to a client until it disconnects."""
+        policy = DROP_NEWEST if self.policy == DISCONNECT else self.policy
+        queue = Buffer(self.queue_size, policy)
+        self.clients[writer] = (queue, uasyncio.current_task())
+        try:
+            async for value in queue:
+                writer.write(value)
+                if not queue.count:
+                    await writer.drain()
+        except (OSError, uasyncio.CancelledError):
+            pass
+        self.clients.pop(writer, None)
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    def disconnect(self, writer):
+        """Disconnect a client, discarding its queued values."""
+        queue, task = self.clients.pop(writer)
+        self.disconnects += 1
+        task.cancel()
+
+    async def process(self, value):
+        """Queue a value to be sent to every client."""
+        if isinstance(value, str):
+            value = value.encode()
+        elif isinstance(value, (bytearray, memoryview)):
+            # copy, as buffers may be reused
+            value = bytes(value)
+        elif not isinstance(value, bytes):
+            value = str(value).encode() + b"\n"
+        for writer, (queue, task) in list(self.clients.items()):
+            if self.policy == DISCONNECT and queue.count == queue.size:
+                self.disconnect(writer)
+            else:
+                await queue.put(value)
+
+    async def run(self):
+        """Serve clients while consuming the source, then close the server."""
+        await self.start()
+        await super().run()
+        await self.close()
+
+    async def close(self):
+        """Stop the server and disconnect all clients."""
+        for writer, (queue, task) in list(self.clients.items()):
+            queue.close()
+            task.cancel()
+        self.clients.clear()
+        if self.server is not None:
+            server = self.server
+            self.server = None
+            server.close()
+            await server.wait_closed()
@@ -3,11 +3,15 @@
 # SPDX-License-Identifier: MIT
 
 import sys
-from typing import AnyStr, IO, Self
+from typing import Any, AnyStr, IO, Self
 
 import uasyncio
 
 from .core import ASink, ASource
+from .pipelines import DROP_NEWEST, DROP_OLDEST, Buffer
+
+#: Slow client policy which disconnects a client whose queue is full.
+DISCONNECT: int
 
 
 
@@ -33,19 +37,115 @@ class AWrite(ASink[AnyStr], StreamMixin):
 
     async def __call__(self, value: AnyStr | None = None) -> None: ...
 
+    async def flush(self) -> None:
+        """Drain any data written to the stream."""
+
     def __ror__(self, other: ASource[AnyStr]) -> AWrite[AnyStr]: ...
 
 
+class ABufferedWrite(AWrite[AnyStr]):
+    """Write to a stream asynchronously, coalescing writes.
+
+    Written data is gathered in a preallocated buffer of threshold bytes and
+    written to the stream in one call once the latency has passed (by
+    default at the next tick of the event loop) or once the buffer is full,
+    whichever is first.  Text is encoded as UTF-8.
+    """
+
+    #: The longest time data waits before it is written, in milliseconds.
+    latency: int
+
+    #: The size of the buffer in bytes.
+    threshold: int
+
+    #: The buffer that data is gathered in.
+    buffer: bytearray
+
+    #: A memoryview of the buffer.
+    view: memoryview
+
+    #: The number of bytes in the buffer.
+    pending: int
+
+    #: The task which will flush the buffer, or None.
+    flush_task: uasyncio.Task | None
+
+    #: A lock held while the stream is draining.
+    lock: uasyncio.Lock
+
+    def __init__(
+        self,
+        stream: IO[AnyStr] = sys.stdout,
+        latency: float = 0,
+        threshold: int = 256,
+        source: ASource[AnyStr] | None = None,
+    ): ...
+
+    async def process(self, source_value: AnyStr) -> None:
+        """Add data to the buffer, flushing if the buffer is full."""
+
+    async def delayed_flush(self) -> None:
+        """Flush the buffer once the latency has passed."""
+
+    async def flush(self) -> None:
+        """Write any buffered data to the stream and drain."""
+
+    async def run(self) -> None:
+        """Consume the source if available, then drain the stream."""
+
+    async def close(self) -> None:
+        """Drain and close the output stream."""
+
+    def __ror__(self, other: ASource[AnyStr]) -> ABufferedWrite[AnyStr]: ...
+
+
 class ARead(ASource[AnyStr], StreamMixin):
-    """Read from a stream asynchronously one character at a time."""
+    """Read from a stream asynchronously one character at a time.
+
+    If chunk_size is given, up to that many characters that are available
+    are read at once and then emitted one at a time without waiting.  This
+    needs a stream whose reads return what is available, such as a UART or
+    socket, so it can't be used with standard input, whose reads block until
+    they are filled.
+    """
 
     stream: uasyncio.StreamReader
 
-    def __init__(self, stream: IO[AnyStr] = sys.stdin): ...
+    #: The maximum number of characters to read at once, or None.
+    chunk_size: int | None
+
+    #: The most recently read chunk.
+    chunk: AnyStr
+
+    #: The index of the next character to emit from the chunk.
+    index: int
+
+    def __init__(self, stream: IO[AnyStr] = sys.stdin, chunk_size: int | None = None): ...
 
     async def __call__(self) -> AnyStr | None: ...
 
 
+class AReadInto(ASource[memoryview], StreamMixin):
+    """Read chunks from a binary stream into a reusable buffer.
+
+    Each value is a memoryview of the bytes read, which is only valid until
+    the next read, so copy it if it needs to be kept.  The stream's reads
+    must return what is available, as a UART or socket does.
+    """
+
+    stream: uasyncio.StreamReader
+
+    #: The buffer that data is read into.
+    buffer: bytearray
+
+    #: A memoryview of the buffer.
+    view: memoryview
+
+    def __init__(self, stream: IO[bytes], size: int = 256): ...
+
+    async def __call__(self) -> memoryview | None: ...
+
+
 class AReadline(ASource[str], StreamMixin):
     """Read from a text stream asynchronously one line at a time."""
 
@@ -54,3 +154,233 @@ class AReadline(ASource[str], StreamMixin):
     def __init__(self, stream: IO[str] = sys.stdin): ...
 
     async def __call__(self) -> str | None: ...
+
+
+class AReadlineInto(ASource[memoryview], StreamMixin):
+    """Read lines from a binary stream into a reusable buffer.
+
+    Each value is a memoryview of a line, including its newline, which is
+    only valid until the next line is read.  Lines longer than max_length
+    are either truncated to max_length bytes or skipped, and are counted.
+    The stream's reads must return what is available, as a UART or socket
+    does.
+    """
+
+    stream: uasyncio.StreamReader
+
+    #: Whether overlong lines are truncated rather than skipped.
+    truncate: bool
+
+    #: The buffer that each line is copied into.
+    line: bytearray
+
+    #: A memoryview of the line buffer.
+    view: memoryview
+
+    #: The buffer that data is read into.
+    chunk: bytearray
+
+    #: The index of the next unprocessed byte in the chunk.
+    start: int
+
+    #: The number of bytes in the chunk.
+    end: int
+
+    #: The number of overlong lines which were truncated.
+    truncated: int
+
+    #: The number of overlong lines which were skipped.
+    errors: int
+
+    def __init__(
+        self,
+        stream: IO[bytes],
+        max_length: int = 128,
+        truncate: bool = True,
+        chunk_size: int = 64,
+    ): ...
+
+    async def __call__(self) -> memoryview | None: ...
+
+
+class AReadFrames(AReadInto):
+    """Base class for sources which decode binary frames from a stream.
+
+    Data is read in chunks and passed a byte at a time to the feed method,
+    which decodes it into a preallocated frame buffer.  Each value is a
+    memoryview of a complete frame, which is only valid until the next frame
+    is read.  Corrupt or overlong frames are discarded and counted in the
+    errors attribute, and decoding resynchronizes at the next frame boundary.
+    """
+
+    #: The buffer that frames are decoded into.
+    frame: bytearray
+
+    #: A memoryview of the frame buffer.
+    frame_view: memoryview
+
+    #: The index of the next unprocessed byte in the read buffer.
+    start: int
+
+    #: The number of bytes in the read buffer.
+    end: int
+
+    #: The number of bytes decoded into the current frame.
+    length: int
+
+    #: Whether the current frame is being discarded.
+    discarding: bool
+
+    #: The number of corrupt or overlong frames discarded.
+    errors: int
+
+    def __init__(
+        self, stream: IO[bytes], max_length: int = 256, chunk_size: int = 64
+    ): ...
+
+    def feed(self, byte: int) -> bool:
+        """Decode a byte, returning True when a frame is complete.
+
+        Subclasses must override.
+        """
+
+    def reset(self) -> None:
+        """Prepare to decode a new frame."""
+
+    def store(self, byte: int) -> None:
+        """Append a decoded byte to the frame, discarding it if it is too long."""
+
+    def error(self) -> None:
+        """Discard the current frame until the next frame boundary."""
+
+    async def __call__(self) -> memoryview | None: ...
+
+
+class AReadLengthPrefixed(AReadFrames):
+    """Read frames which are preceded by their length.
+
+    The length is encoded with the struct format given by header, by default
+    a single unsigned byte.  Frames longer than max_length are skipped.
+    """
+
+    #: The struct format of the length header.
+    header_format: str
+
+    #: The buffer that the header is read into.
+    header: bytearray
+
+    #: The number of header bytes read for the current frame.
+    header_count: int
+
+    #: The length of the current frame.
+    expected: int
+
+    def __init__(
+        self,
+        stream: IO[bytes],
+        max_length: int = 256,
+        header: str = "B",
+        chunk_size: int = 64,
+    ): ...
+
+
+#: The COBS frame delimiter.
+COBS_DELIMITER: int
+
+
+class AReadCOBS(AReadFrames):
+    """Read frames encoded with Consistent Overhead Byte Stuffing.
+
+    Frames are separated by zero bytes.
+    """
+
+    #: The code byte of the current block.
+    code: int
+
+    #: The number of bytes remaining in the current block.
+    remaining: int
+
+
+#: The SLIP frame delimiter.
+SLIP_END: int
+
+#: The SLIP escape byte.
+SLIP_ESC: int
+
+#: The escaped form of SLIP_END.
+SLIP_ESC_END: int
+
+#: The escaped form of SLIP_ESC.
+SLIP_ESC_ESC: int
+
+
+class AReadSLIP(AReadFrames):
+    """Read frames encoded with the Serial Line Internet Protocol."""
+
+    #: Whether the previous byte was an escape byte.
+    escaped: bool
+
+
+class ABroadcastServer(ASink[Any], StreamMixin):
+    """Sink which sends values to every client connected to a TCP server.
+
+    Each client has a bounded queue which a task per client sends to the
+    client, coalescing queued values into a single drain.  When a client's
+    queue is full the policy determines whether the oldest value is dropped
+    (DROP_OLDEST), the new value is dropped (DROP_NEWEST), or the client is
+    disconnected (DISCONNECT), so a slow client never holds up the source.
+    Any other policy raises a ValueError.
+
+    Text is sent encoded as UTF-8 and buffers are sent as-is, while any other
+    value, such as a number, is sent as a line of text.
+    """
+
+    #: The address to listen on.
+    host: str
+
+    #: The port to listen on.
+    port: int
+
+    #: The number of values which can be queued for each client.
+    queue_size: int
+
+    #: The policy applied when a client's queue is full.
+    policy: int
+
+    #: The queue and task of each client, keyed by the client's stream writer.
+    clients: dict[uasyncio.StreamWriter, tuple[Buffer[bytes], uasyncio.Task]]
+
+    #: The running server, or None.
+    server: uasyncio.Server | None
+
+    #: The number of clients disconnected for being too slow.
+    disconnects: int
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        queue_size: int = 16,
+        policy: int = DROP_OLDEST,
+        source: ASource[bytes | str | memoryview] | None = None,
+    ): ...
+
+    async def start(self) -> None:
+        """Start listening for clients."""
+
+    async def serve(self, reader: uasyncio.StreamReader, writer: uasyncio.StreamWriter) -> None:
+        """Send queued values to a client until it disconnects."""
+
+    def disconnect(self, writer: uasyncio.StreamWriter) -> None:
+        """Disconnect a client, discarding its queued values."""
+
+    async def process(self, value: Any) -> None:
+        """Queue a value to be sent to every client."""
+
+    async def run(self) -> None:
+        """Serve clients while consuming the source, then close the server."""
+
+    async def close(self) -> None:
+        """Stop the server and disconnect all clients."""
+
+    def __ror__(self, other: ASource[bytes | str | memoryview]) -> ABroadcastServer: ...
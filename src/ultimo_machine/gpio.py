@@ -4,17 +4,17 @@
 
 from machine import ADC, PWM, Pin, Signal
 
-from ultimo.core import ASink, ThreadSafeSource, asynchronize
+from ultimo.core import ASink, BufferedThreadSafeSource, ThreadSafeSource, asynchronize
 from ultimo.poll import Poll
 
 
 class PollPin(Poll):
     """A source which sets up a pin and polls its value."""
 
-    def __init__(self, pin_id, pull, interval=0.001):
+    def __init__(self, pin_id, pull, interval=0.001, max_interval=None):
         self.pin = Pin(pin_id)
         self.pull = pull
-        super().__init__(asynchronize(self.pin.value), interval)
+        super().__init__(asynchronize(self.pin.value), interval, max_interval=max_interval)
         self.init()
 
     def init(self):
@@ -24,17 +24,17 @@ class PollPin(Poll):
 class PollSignal(Poll):
     """A source which sets up a Singal on a pin and polls its value."""
 
-    def __init__(self, pin_id, pull, invert=False, interval=0.001):
+    def __init__(self, pin_id, pull, invert=False, interval=0.001, max_interval=None):
         self.signal = Signal(pin_id, Pin.IN, pull, invert=invert)
-        super().__init__(asynchronize(self.signal.value), interval)
+        super().__init__(asynchronize(self.signal.value), interval, max_interval=max_interval)
 
 
 class PollADC(Poll):
     """A source which sets up an ADC and polls its value."""
 
-    def __init__(self, pin_id, interval=0.001):
+    def __init__(self, pin_id, interval=0.001, max_interval=None):
         self.adc = ADC(pin_id)
-        super().__init__(asynchronize(self.adc.read_u16), interval)
+        super().__init__(asynchronize(self.adc.read_u16), interval, max_interval=max_interval)
 
 
 class PinInterrupt(ThreadSafeSource):
@@ -71,6 +71,38 @@ class PinInterrupt(ThreadSafeSource):
         self.pin.irq()
 
 
+class BufferedPinInterrupt(BufferedThreadSafeSource):
+    """A source which queues the time and pin value of every IRQ on a pin.
+
+    The class acts as a context manager to set-up and remove the IRQ handler.
+    """
+
+    def __init__(self, pin_id, pull, trigger=Pin.IRQ_RISING, size=32, hard=True):
+        super().__init__(size, "B")
+        self.pin = Pin(pin_id)
+        self.pull = pull
+        self.trigger = trigger
+        self.hard = hard
+
+    async def __aenter__(self):
+        record = self.record
+
+        def isr(pin):
+            record(pin.value())
+
+        self.pin.init(Pin.IN, self.pull)
+        self.pin.irq(isr, self.trigger, hard=self.hard)
+
+        return self
+
+    async def __aexit__(self, *args, **kwargs):
+        await self.close()
+        return False
+
+    async def close(self):
+        self.pin.irq()
+
+
 class PinSink(ASink):
     """A sink that sets the value on a pin."""
 
@@ -6,14 +6,16 @@ from typing import Self
 
 from machine import ADC, PWM, Pin, Signal
 
-from ultimo.core import ASource, ASink, ThreadSafeSource, asynchronize
+from ultimo.core import ASource, ASink, BufferedThreadSafeSource, ThreadSafeSource, asynchronize
 from ultimo.poll import Poll
 
 
 class PollPin(Poll[bool]):
     """A source which sets up a pin and polls its value."""
 
-    def __init__(self, pin_id: int, pull: int, interval: float = 0.001): ...
+    def __init__(
+        self, pin_id: int, pull: int, interval: float = 0.001, max_interval: float | None = None
+    ): ...
 
     def init(self) -> None: ...
 
@@ -21,13 +23,22 @@ class PollPin(Poll[bool]):
 class PollSignal(Poll[bool]):
     """A source which sets up a Singal on a pin and polls its value."""
 
-    def __init__(self, pin_id: int, pull: int, invert: bool = False, interval=0.001): ...
+    def __init__(
+        self,
+        pin_id: int,
+        pull: int,
+        invert: bool = False,
+        interval: float = 0.001,
+        max_interval: float | None = None,
+    ): ...
 
 
 class PollADC(Poll[int]):
     """A source which sets up an ADC and polls its value."""
 
-    def __init__(self, pin_id: int, interval=0.001): ...
+    def __init__(
+        self, pin_id: int, interval: float = 0.001, max_interval: float | None = None
+    ): ...
 
 
 class PinInterrupt(ThreadSafeSource[bool]):
@@ -47,6 +58,37 @@ class PinInterrupt(ThreadSafeSource[bool]):
     async def close(self) -> None: ...
 
 
+class BufferedPinInterrupt(BufferedThreadSafeSource):
+    """A source which queues the time and pin value of every IRQ on a pin.
+
+    The class acts as a context manager to set-up and remove the IRQ handler.
+    """
+
+    pin: Pin
+
+    pull: int
+
+    trigger: int
+
+    #: Whether to use a hard IRQ handler.
+    hard: bool
+
+    def __init__(
+        self,
+        pin_id: int,
+        pull: int,
+        trigger: int = Pin.IRQ_RISING,
+        size: int = 32,
+        hard: bool = True,
+    ): ...
+
+    async def __aenter__(self) -> Self: ...
+
+    async def __aexit__(self, *args, **kwargs) -> bool: ...
+
+    async def close(self) -> None: ...
+
+
 class PinSink(ASink[bool]):
     """A sink that sets the value on a pin."""
 
@@ -5,7 +5,23 @@
 import unittest
 import uasyncio
 
-from ultimo.core import APipeline, ASource, ASink, asynchronize
+from ultimo.core import (
+    APipeline,
+    ASource,
+    ASink,
+    BufferedThreadSafeSource,
+    FusedFlow,
+    Multicast,
+    aiter,
+    anext,
+    asink,
+    asynchronize,
+    combine_latest,
+    merge,
+    sink,
+    zip,
+)
+from ultimo.poll import Poll
 
 class FiniteSource(ASource):
 
@@ -138,6 +154,329 @@ class TestAPipeline(unittest.TestCase):
         self.assertEqual(sink.results, [11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1])
 
 
+class DoublePipeline(APipeline):
+
+    synchronous = True
+
+    def process(self, value):
+        return 2 * value
+
+
+class SquarePipeline(APipeline):
+
+    synchronous = True
+
+    def process(self, value):
+        return value * value
+
+
+class OddPipeline(APipeline):
+
+    async def process(self, value):
+        if value % 2:
+            return value
+
+
+class TestFusedFlow(unittest.TestCase):
+
+    def test_fused_chain(self):
+        source = FiniteSource(5)
+        pipeline = source | OddPipeline() | DoublePipeline() | SquarePipeline()
+
+        flow = aiter(pipeline)
+        result = []
+
+        async def iterate():
+            async for value in flow:
+                result.append(value)
+
+        uasyncio.run(iterate())
+
+        self.assertIsInstance(flow, FusedFlow)
+        self.assertEqual(len(flow.stages), 3)
+        self.assertEqual(result, [100, 36, 4])
+
+    def test_unfusable_stage(self):
+        class Negate(APipeline):
+
+            async def __call__(self, value=None):
+                value = await super().__call__(value)
+                if value is not None:
+                    return -value
+
+        source = FiniteSource(3)
+        pipeline = source | DoublePipeline() | Negate() | SquarePipeline()
+
+        flow = aiter(pipeline)
+        result = []
+
+        async def iterate():
+            async for value in flow:
+                result.append(value)
+
+        uasyncio.run(iterate())
+
+        self.assertEqual(len(flow.stages), 1)
+        self.assertEqual(result, [36, 16, 4, 0])
+
+
+class TestMulticast(unittest.TestCase):
+
+    def test_shared(self):
+        source = FiniteSource(5)
+        calls = 0
+
+        async def counted():
+            nonlocal calls
+            calls += 1
+            return await source()
+
+        shared = Multicast(source=Poll(counted, 0.01))
+        first = []
+        second = []
+
+        async def collect(result):
+            async for value in shared:
+                result.append(value)
+
+        async def main():
+            await uasyncio.gather(collect(first), collect(second))
+
+        uasyncio.run(main())
+
+        self.assertEqual(first, [5, 4, 3, 2, 1, 0])
+        self.assertEqual(second, [5, 4, 3, 2, 1, 0])
+        self.assertEqual(calls, 7)
+        self.assertIsNone(shared.task)
+
+    def test_slow_subscriber(self):
+        source = FiniteSource(5)
+        shared = Multicast(source=source)
+        fast = []
+        slow = []
+
+        async def collect(result, delay):
+            async for value in shared:
+                result.append(value)
+                await uasyncio.sleep(delay)
+
+        async def main():
+            await uasyncio.gather(collect(fast, 0), collect(slow, 0.025))
+
+        uasyncio.run(main())
+
+        self.assertEqual(fast, [5, 4, 3, 2, 1, 0])
+        self.assertLess(len(slow), len(fast))
+        self.assertEqual(slow[-1], 0)
+
+    def test_early_exit(self):
+        calls = 0
+
+        async def counted():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        shared = Multicast(source=Poll(counted, 0.005))
+
+        async def main():
+            flow = aiter(shared)
+            async for value in flow:
+                if value == 2:
+                    break
+            flow.close()
+            stopped = shared.task is None
+            count = calls
+            await uasyncio.sleep(0.05)
+            return stopped, calls - count
+
+        stopped, extra = uasyncio.run(main())
+
+        self.assertTrue(stopped)
+        self.assertEqual(extra, 0)
+        self.assertEqual(shared.flows, [])
+
+
+class TestBufferedThreadSafeSource(unittest.TestCase):
+
+    def test_burst(self):
+        source = BufferedThreadSafeSource(4)
+
+        for value in [1, 0, 1]:
+            source.record(value)
+
+        async def main():
+            flow = aiter(source)
+            result = []
+            for i in range(3):
+                result.append(await anext(flow))
+            return result
+
+        result = uasyncio.run(main())
+
+        self.assertEqual([value for ticks, value in result], [1, 0, 1])
+        self.assertLessEqual(result[0][0], result[1][0])
+        self.assertEqual(source.overruns, 0)
+
+    def test_overrun(self):
+        source = BufferedThreadSafeSource(2)
+
+        for value in range(5):
+            source.record(value)
+
+        async def main():
+            flow = aiter(source)
+            result = []
+            for i in range(2):
+                result.append(await anext(flow))
+            source.record(7)
+            result.append(await anext(flow))
+            return result
+
+        result = uasyncio.run(main())
+
+        self.assertEqual([value for ticks, value in result], [0, 1, 7])
+        self.assertEqual(source.overruns, 3)
+
+
+class TestCombinators(unittest.TestCase):
+
+    def test_merge(self):
+        source = merge(FiniteSource(2), FiniteSource(3))
+
+        async def main():
+            result = []
+            async for value in source:
+                result.append(value)
+            return result
+
+        result = uasyncio.run(main())
+
+        self.assertEqual(sorted(result), [0, 0, 1, 1, 2, 2, 3])
+
+    def test_merge_immediate(self):
+        source = merge(FiniteSource(-1), FiniteSource(2))
+
+        result = uasyncio.run(source())
+
+        self.assertEqual(result, 2)
+
+    def test_zip(self):
+        source = zip(FiniteSource(2), FiniteSource(4))
+
+        async def main():
+            result = []
+            async for value in source:
+                result.append(value)
+            return result
+
+        result = uasyncio.run(main())
+
+        self.assertEqual(result, [(2, 4), (1, 3), (0, 2)])
+
+    def test_combine_latest(self):
+        source = combine_latest(FiniteSource(2), FiniteSource(-1), FiniteSource(1))
+
+        async def main():
+            result = []
+            async for value in source:
+                result.append(value)
+            return result
+
+        result = uasyncio.run(main())
+
+        # the second source never produces a value, so nothing is combined
+        self.assertEqual(result, [])
+
+    def test_combine_latest_changes(self):
+        source = combine_latest(FiniteSource(2), FiniteSource(1))
+
+        async def main():
+            result = []
+            async for value in source:
+                result.append(value)
+            return result
+
+        result = uasyncio.run(main())
+
+        self.assertEqual(result[-1], (0, 0))
+        self.assertIn((2, 1), result)
+
+    def test_close(self):
+        source = merge(FiniteSource(100), FiniteSource(100))
+
+        async def main():
+            flow = aiter(source)
+            value = await anext(flow)
+            flow.close()
+            await uasyncio.sleep(0.02)
+            return value, flow
+
+        value, flow = uasyncio.run(main())
+
+        self.assertEqual(value, 100)
+        self.assertEqual(flow.active, 0)
+
+    def test_early_exit(self):
+        calls = 0
+
+        async def counted():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        source = merge(Poll(counted, 0.005), Poll(counted, 0.005))
+
+        async def main():
+            flow = aiter(source)
+            await uasyncio.sleep(0.02)
+            started = calls
+            async for value in flow:
+                if value >= 2:
+                    break
+            flow.close()
+            await uasyncio.sleep(0.01)
+            count = calls
+            await uasyncio.sleep(0.05)
+            return started, calls - count, flow
+
+        started, extra, flow = uasyncio.run(main())
+
+        # the inputs aren't read until the flow is iterated
+        self.assertEqual(started, 0)
+        self.assertEqual(extra, 0)
+        self.assertEqual(flow.active, 0)
+
+
+class TestConsumerDecorators(unittest.TestCase):
+
+    def test_sink(self):
+        results = []
+
+        @sink
+        def collect(value, result):
+            result.append(value)
+
+        consumer = FiniteSource(3) | collect(results)
+        uasyncio.run(consumer.run())
+
+        self.assertTrue(consumer.synchronous)
+        self.assertEqual(results, [3, 2, 1, 0])
+
+    def test_asink(self):
+        results = []
+
+        @asink
+        async def collect(value, result):
+            result.append(value)
+
+        consumer = FiniteSource(3) | collect(results)
+        uasyncio.run(consumer.run())
+
+        self.assertFalse(consumer.synchronous)
+        self.assertEqual(results, [3, 2, 1, 0])
+
+
 class TestAsynchronize(unittest.TestCase):
 
     def test_sync(self):
@@ -4,7 +4,7 @@
 
 import unittest
 
-from ultimo.interpolate import linear
+from ultimo.interpolate import fixed_linear, linear
 
 class TestInterpolate(unittest.TestCase):
 
@@ -13,5 +13,11 @@ class TestInterpolate(unittest.TestCase):
 
         self.assertAlmostEqual(value, 7.5)
 
+    def test_fixed_linear(self):
+        value = fixed_linear(5, 15, 1, 4)
+
+        self.assertEqual(value, 7)
+        self.assertIsInstance(value, int)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,47 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import array
+import unittest
+
+from ultimo.kernels import batch_dedup, batch_ewma, ewma, median_update
+
+
+class TestKernels(unittest.TestCase):
+
+    def test_ewma(self):
+        value = ewma(5, 10, 0.5)
+
+        self.assertAlmostEqual(value, 7.5)
+
+    def test_batch_ewma(self):
+        result = []
+
+        value = batch_ewma([4, 8, 8], result, None, 0.5)
+
+        self.assertEqual(result, [4, 6, 7])
+        self.assertEqual(value, 7)
+
+    def test_batch_dedup(self):
+        result = []
+
+        value = batch_dedup([1, 1, 2, 2, 1], result, 1)
+
+        self.assertEqual(result, [2, 1])
+        self.assertEqual(value, 1)
+
+    def test_median_update(self):
+        ordered = array.array("i", [0] * 3)
+        result = []
+        values = [5, 1, 9, 2]
+        for count, value in enumerate(values[:3], 1):
+            result.append(median_update(ordered, count, None, value))
+        result.append(median_update(ordered, 3, 5, 2))
+
+        self.assertEqual(result, [5, 1, 5, 2])
+        self.assertEqual(list(ordered), [1, 2, 9])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import unittest
+import uasyncio
+
+from ultimo import metrics
+from ultimo.core import AFlow, APipeline, ASource, ASink
+from ultimo.pipelines import EWMA, Buffer, Cache, Dedup, Debounce
+
+
+class FiniteSource(ASource):
+
+    def __init__(self, count):
+        self.count = count
+
+    async def __call__(self):
+        await uasyncio.sleep(0.001)
+        value = self.count
+        self.count -= 1
+        if value < 0:
+            return None
+        else:
+            return value
+
+
+class OddPipeline(APipeline):
+
+    synchronous = True
+
+    def process(self, value):
+        if value % 2:
+            return value
+
+
+class CollectingSink(ASink):
+
+    def __init__(self, source=None):
+        super().__init__(source)
+        self.results = []
+
+    async def process(self, value):
+        self.results.append(value)
+
+
+class TestMetrics(unittest.TestCase):
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+
+    def test_enable(self):
+        original = AFlow.__anext__
+        metrics.enable()
+
+        self.assertIsNot(AFlow.__anext__, original)
+
+        metrics.disable()
+
+        self.assertIs(AFlow.__anext__, original)
+
+    def test_record(self):
+        source = FiniteSource(5)
+        pipeline = OddPipeline()
+        sink = source | pipeline | CollectingSink()
+        metrics.enable()
+
+        uasyncio.run(sink.run())
+
+        self.assertEqual(sink.results, [5, 3, 1])
+
+        source_metrics = metrics.registry["flow"][source]
+        self.assertEqual(source_metrics.count, 6)
+        self.assertEqual(source_metrics.none_count, 1)
+        self.assertGreater(source_metrics.mean_us, 0)
+
+        pipeline_metrics = metrics.registry["pipeline"][pipeline]
+        self.assertEqual(pipeline_metrics.count, 3)
+        self.assertEqual(pipeline_metrics.none_count, 3)
+
+        sink_metrics = metrics.registry["sink"][sink]
+        self.assertEqual(sink_metrics.count, 3)
+        self.assertIsNotNone(sink_metrics.last_ticks)
+
+        report = metrics.report()
+        self.assertIn("OddPipeline", report)
+
+    def test_overrides(self):
+        source = FiniteSource(5)
+        stages = [Cache(), EWMA(0.5), Dedup(), Debounce(), Buffer()]
+        sink = source
+        for stage in stages:
+            sink = sink | stage
+        sink = sink | CollectingSink()
+        original = Cache.__call__
+        metrics.enable()
+
+        self.assertIsNot(Cache.__call__, original)
+
+        uasyncio.run(sink.run())
+
+        self.assertEqual(sink.results, [5] * 6)
+        for stage in stages:
+            # stages with their own flows are recorded as flows
+            count = 0
+            for kind_metrics in metrics.registry.values():
+                if stage in kind_metrics:
+                    count += kind_metrics[stage].count
+            self.assertGreater(count, 0)
+
+        # Debounce calls APipeline.__call__, but is only recorded once
+        self.assertEqual(metrics.registry["pipeline"][stages[3]].count, 6)
+
+        metrics.disable()
+
+        self.assertIs(Cache.__call__, original)
+
+    def test_disabled(self):
+        sink = FiniteSource(3) | OddPipeline() | CollectingSink()
+
+        uasyncio.run(sink.run())
+
+        self.assertEqual(sink.results, [3, 1])
+        self.assertEqual(metrics.report(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,620 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import unittest
+import uasyncio
+import utime
+
+from ultimo.core import ASource
+from ultimo.pipelines import (
+    BLOCK,
+    DROP_NEWEST,
+    DROP_OLDEST,
+    Batch,
+    BatchApply,
+    BatchDedup,
+    BatchEWMA,
+    BatchFilter,
+    Buffer,
+    Cache,
+    Deadband,
+    Debounce,
+    EdgeDebounce,
+    FixedEWMA,
+    Filter,
+    Median,
+    MovingAverage,
+    MovingMax,
+    MovingMin,
+    Pack,
+    Sample,
+    Settle,
+    Throttle,
+    Unpack,
+    afilter,
+    apipe,
+    filter,
+    pipe,
+)
+from ultimo.poll import Poll
+
+
+class ListSource(ASource):
+
+    def __init__(self, values, delay=0.001):
+        self.values = list(values)
+        self.delay = delay
+
+    async def __call__(self):
+        await uasyncio.sleep(self.delay)
+        if self.values:
+            return self.values.pop(0)
+        else:
+            return None
+
+
+class DelayedSource(ASource):
+    """Source of values which each arrive after their own delay."""
+
+    def __init__(self, items):
+        self.items = list(items)
+
+    async def __call__(self):
+        if not self.items:
+            return None
+        delay, value = self.items.pop(0)
+        await uasyncio.sleep(delay)
+        return value
+
+
+def collect(source):
+    result = []
+
+    async def iterate():
+        async for value in source:
+            result.append(list(value) if isinstance(value, (list, tuple)) else value)
+
+    uasyncio.run(iterate())
+    return result
+
+
+class TestFilter(unittest.TestCase):
+
+    def test_synchronous(self):
+        stage = Filter(lambda value, divisor: value % divisor, (3,), synchronous=True)
+
+        result = collect(ListSource(range(7)) | stage)
+
+        self.assertTrue(stage.synchronous)
+        self.assertEqual(result, [1, 2, 4, 5])
+
+    def test_asynchronous(self):
+        async def odd(value):
+            return value % 2
+
+        stage = Filter(odd)
+
+        result = collect(ListSource(range(5)) | stage)
+
+        self.assertFalse(stage.synchronous)
+        self.assertEqual(result, [1, 3])
+
+
+class TestDecorators(unittest.TestCase):
+
+    def test_pipe(self):
+        @pipe
+        def scale(value, factor):
+            return value * factor
+
+        stage = scale(10)
+        result = collect(ListSource(range(3)) | stage)
+
+        self.assertTrue(stage.synchronous)
+        self.assertEqual(result, [0, 10, 20])
+
+    def test_apipe(self):
+        @apipe
+        async def scale(value, factor):
+            return value * factor
+
+        stage = scale(10)
+        result = collect(ListSource(range(3)) | stage)
+
+        self.assertFalse(stage.synchronous)
+        self.assertEqual(result, [0, 10, 20])
+
+    def test_filter(self):
+        @filter
+        def odd(value):
+            return value % 2
+
+        stage = odd()
+        result = collect(ListSource(range(5)) | stage)
+
+        self.assertTrue(stage.synchronous)
+        self.assertEqual(result, [1, 3])
+
+    def test_afilter(self):
+        @afilter
+        async def odd(value):
+            return value % 2
+
+        result = collect(ListSource(range(5)) | odd())
+
+        self.assertEqual(result, [1, 3])
+
+    def test_immediate(self):
+        @pipe
+        def double(value):
+            return 2 * value
+
+        result = uasyncio.run(double()(4))
+
+        self.assertEqual(result, 8)
+
+
+class TestStruct(unittest.TestCase):
+
+    def test_unpack(self):
+        source = ListSource([b"\x01\x02\x00", b"\x03\x04\x01", b"\x05"])
+
+        result = collect(source | Unpack("<BH"))
+
+        self.assertEqual(result, [[1, 2], [3, 260]])
+
+    def test_unpack_fields(self):
+        source = ListSource([memoryview(b"\xff\x10\x00\x20\x00")])
+        unpack = source | Unpack("<hh", "x y", offset=1)
+
+        result = uasyncio.run(unpack())
+
+        self.assertEqual((result.x, result.y), (16, 32))
+
+    def test_unpack_errors(self):
+        source = ListSource([b"\x01", b"\x01\x02"])
+        unpack = source | Unpack("<H")
+
+        result = collect(unpack)
+
+        self.assertEqual(result, [[513]])
+        self.assertEqual(unpack.errors, 1)
+
+    def test_pack(self):
+        source = ListSource([(1, 2), (3, 260)])
+        result = []
+
+        async def main():
+            async for value in source | Pack("<BH"):
+                result.append(bytes(value))
+
+        uasyncio.run(main())
+
+        self.assertEqual(result, [b"\x01\x02\x00", b"\x03\x04\x01"])
+
+    def test_pack_single(self):
+        source = ListSource([7])
+
+        result = uasyncio.run((source | Pack("<H"))())
+
+        self.assertEqual(bytes(result), b"\x07\x00")
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_batch(self):
+        source = ListSource(range(7))
+
+        result = []
+
+        async def iterate():
+            async for batch in source | Batch(3):
+                result.append(list(batch))
+
+        uasyncio.run(iterate())
+
+        self.assertEqual(result, [[0, 1, 2], [3, 4, 5], [6]])
+
+    def test_batch_array(self):
+        source = ListSource(range(4))
+        pipeline = source | Batch(2, typecode="H")
+
+        result = []
+
+        async def iterate():
+            async for batch in pipeline:
+                result.append(list(batch))
+
+        uasyncio.run(iterate())
+
+        self.assertEqual(result, [[0, 1], [2, 3]])
+
+    def test_batch_timeout(self):
+        source = ListSource(range(4), delay=0.02)
+        pipeline = source | Batch(10, timeout=0.03)
+
+        result = []
+
+        async def iterate():
+            async for batch in pipeline:
+                result.append(list(batch))
+
+        uasyncio.run(iterate())
+
+        self.assertEqual(sum(result, []), [0, 1, 2, 3])
+        self.assertGreater(len(result), 1)
+
+    def test_batch_stalled(self):
+        source = DelayedSource([(0, 0), (0, 1), (0.2, 2)])
+        pipeline = source | Batch(10, timeout=0.03)
+
+        async def main():
+            start = utime.ticks_ms()
+            result = []
+            async for batch in pipeline:
+                result.append((list(batch), utime.ticks_diff(utime.ticks_ms(), start)))
+            return result
+
+        result = uasyncio.run(main())
+
+        self.assertEqual([batch for batch, elapsed in result], [[0, 1], [2]])
+        self.assertLess(result[0][1], 100)
+
+    def test_batch_timeout_full(self):
+        source = ListSource(range(6))
+        pipeline = source | Batch(2, timeout=1)
+
+        async def main():
+            result = []
+            async for batch in pipeline:
+                # the buffer must not change while it is being used
+                await uasyncio.sleep(0.01)
+                result.append(list(batch))
+            return result
+
+        result = uasyncio.run(main())
+
+        self.assertEqual(result, [[0, 1], [2, 3], [4, 5]])
+
+    def test_batch_pipelines(self):
+        source = ListSource([1, 1, 2, 2, 3, 4, 4, 5])
+        pipeline = (
+            source
+            | Batch(4)
+            | BatchDedup()
+            | BatchFilter(lambda x: x != 3)
+            | BatchApply(lambda x, y: x * y, (10,))
+        )
+
+        result = collect(pipeline)
+
+        self.assertEqual(result, [[10, 20], [40, 50]])
+
+    def test_batch_ewma(self):
+        source = ListSource([0, 2, 2, 4])
+        pipeline = source | Batch(2) | BatchEWMA(0.5)
+
+        result = collect(pipeline)
+
+        self.assertEqual(result, [[0, 1.0], [1.5, 2.75]])
+
+
+class TestBuffer(unittest.TestCase):
+
+    def consume_slowly(self, buffer):
+        result = []
+
+        async def iterate():
+            async for value in buffer:
+                result.append(value)
+                await uasyncio.sleep(0.01)
+
+        uasyncio.run(iterate())
+        return result
+
+    def test_drop_oldest(self):
+        buffer = ListSource(range(10), delay=0) | Buffer(3, DROP_OLDEST)
+
+        result = self.consume_slowly(buffer)
+
+        self.assertEqual(result[-3:], [7, 8, 9])
+        self.assertEqual(len(result) + buffer.dropped, 10)
+        self.assertGreater(buffer.dropped, 0)
+        self.assertEqual(buffer.high_water, 3)
+
+    def test_drop_newest(self):
+        buffer = ListSource(range(10), delay=0) | Buffer(3, DROP_NEWEST)
+
+        result = self.consume_slowly(buffer)
+
+        self.assertEqual(result[:3], [0, 1, 2])
+        self.assertEqual(len(result) + buffer.dropped, 10)
+        self.assertGreater(buffer.dropped, 0)
+
+    def test_block(self):
+        buffer = ListSource(range(10), delay=0) | Buffer(3, BLOCK)
+
+        result = self.consume_slowly(buffer)
+
+        self.assertEqual(result, list(range(10)))
+        self.assertEqual(buffer.dropped, 0)
+        self.assertEqual(buffer.high_water, 3)
+
+    def test_no_source(self):
+        buffer = Buffer(2)
+
+        async def main():
+            await buffer(1)
+            await buffer(2)
+            await buffer(3)
+            return [await buffer(), await buffer(), await buffer()]
+
+        result = uasyncio.run(main())
+
+        self.assertEqual(result, [2, 3, None])
+        self.assertEqual(buffer.dropped, 1)
+
+
+class TestCache(unittest.TestCase):
+
+    def test_cache(self):
+        source = ListSource(range(10))
+        cache = source | Cache(0.02)
+
+        async def main():
+            result = [await cache(), await cache()]
+            await uasyncio.sleep(0.03)
+            result.append(await cache())
+            return result
+
+        result = uasyncio.run(main())
+
+        self.assertEqual(result, [0, 0, 1])
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 2)
+
+    def test_flow_refreshes(self):
+        source = ListSource(range(3))
+        cache = source | Cache(1)
+
+        async def main():
+            async for value in cache:
+                pass
+            return await cache()
+
+        result = uasyncio.run(main())
+
+        self.assertEqual(result, 2)
+        self.assertEqual(cache.hits, 1)
+
+
+class TestRateLimiters(unittest.TestCase):
+
+    def test_debounce(self):
+        source = ListSource(range(10), delay=0.005)
+
+        result = collect(source | Debounce(0.1))
+
+        self.assertEqual(result, [0] * 10)
+
+    def test_throttle(self):
+        source = ListSource(range(10), delay=0.005)
+
+        result = collect(source | Throttle(0.1))
+
+        self.assertEqual(result, [0])
+
+    def test_sample(self):
+        values = iter(range(100))
+
+        async def counter():
+            return next(values)
+
+        async def main():
+            sampled = Poll(counter, 0.001) | Sample(0.02)
+            start = utime.ticks_ms()
+            result = []
+            async for value in sampled:
+                result.append(value)
+                if len(result) == 3:
+                    break
+            return result, utime.ticks_diff(utime.ticks_ms(), start)
+
+        (result, elapsed) = uasyncio.run(main())
+
+        self.assertEqual(result, [0, 1, 2])
+        self.assertGreaterEqual(elapsed, 35)
+
+    def test_sample_filtered(self):
+        values = iter(range(100))
+
+        async def counter():
+            return next(values)
+
+        @filter
+        def even(value):
+            return value % 2 == 0
+
+        async def main():
+            sampled = Poll(counter, 0.001) | even() | Sample(0.005)
+            result = []
+            async for value in sampled:
+                result.append(value)
+                if len(result) == 3:
+                    break
+            return result
+
+        result = uasyncio.run(main())
+
+        self.assertEqual(result, [0, 2, 4])
+
+    def test_settle(self):
+        source = ListSource(range(10), delay=0.001)
+
+        result = collect(source | Settle(0.05))
+
+        self.assertEqual(result, [9])
+
+    def test_settle_quiet(self):
+        source = ListSource(range(3), delay=0.03)
+
+        result = collect(source | Settle(0.01))
+
+        self.assertEqual(result, [0, 1, 2])
+
+
+class EdgeSource(ASource):
+    """Source of timestamped edges which then waits without ending.
+
+    Each edge is a (delay, offset_us, level) tuple, and is timestamped with
+    the offset from the time it is emitted.
+    """
+
+    def __init__(self, edges):
+        self.edges = list(edges)
+
+    async def __call__(self):
+        if not self.edges:
+            await uasyncio.sleep(1)
+            return None
+        delay, offset, level = self.edges.pop(0)
+        await uasyncio.sleep(delay)
+        return (utime.ticks_add(utime.ticks_us(), offset), level)
+
+
+async def first_value(source):
+    start = utime.ticks_ms()
+    flow = source.__aiter__()
+    value = await flow.__anext__()
+    elapsed = utime.ticks_diff(utime.ticks_ms(), start)
+    flow.close()
+    return value, elapsed
+
+
+class TestEdgeDebounce(unittest.TestCase):
+
+    def test_bounces(self):
+        # a bouncing press, a stable press, and a bouncing release
+        source = ListSource([1, 0, 1, 1, 1, 0, 1, 0], delay=0.001)
+
+        result = collect(source | EdgeDebounce(0.02))
+
+        self.assertEqual(result, [0])
+
+    def test_transitions(self):
+        source = ListSource([1, 0, 1, 1, 0, 0], delay=0.01)
+
+        result = collect(source | EdgeDebounce(0.015))
+
+        self.assertEqual(result, [1, 0])
+
+    def test_timestamps(self):
+        # bouncing edges are only confirmed once the last has settled
+        source = EdgeSource([(0, 0, 1), (0.002, 0, 0), (0.002, 0, 1)])
+        debounce = source | EdgeDebounce(0.01)
+
+        level, elapsed = uasyncio.run(first_value(debounce))
+
+        self.assertEqual(level, 1)
+        self.assertGreaterEqual(elapsed, 13)
+        self.assertEqual(uasyncio.run(debounce()), 1)
+
+    def test_stale_edge(self):
+        # the edge settled long ago, so it is confirmed without waiting
+        source = EdgeSource([(0, -30000, 1)])
+        debounce = source | EdgeDebounce(0.01)
+
+        level, elapsed = uasyncio.run(first_value(debounce))
+
+        self.assertEqual(level, 1)
+        self.assertLess(elapsed, 5)
+
+    def test_same_level_edge(self):
+        # a second edge to the same level restarts the settle time
+        source = EdgeSource([(0, 0, 0), (0.01, 0, 0)])
+        debounce = source | EdgeDebounce(0.02)
+
+        level, elapsed = uasyncio.run(first_value(debounce))
+
+        self.assertEqual(level, 0)
+        self.assertGreaterEqual(elapsed, 28)
+
+
+class TestDeadband(unittest.TestCase):
+
+    def test_threshold(self):
+        source = ListSource([100, 101, 99, 103, 102, 98, 97])
+
+        result = collect(source | Deadband(2))
+
+        self.assertEqual(result, [100, 103, 98])
+
+    def test_relative(self):
+        source = ListSource([100, 105, 111, 10, 11, 12])
+
+        result = collect(source | Deadband(1, relative=0.1))
+
+        self.assertEqual(result, [100, 111, 10, 12])
+
+    def test_hysteresis(self):
+        source = ListSource([0, 5, 11, 8, 4, 6])
+
+        result = collect(source | Deadband(rising=10, falling=5))
+
+        self.assertEqual(result, [0, 11, 4])
+
+
+class TestFixedEWMA(unittest.TestCase):
+
+    def test_fixed_ewma(self):
+        source = ListSource([16, 32, 32, 0])
+
+        result = collect(source | FixedEWMA(1))
+
+        self.assertEqual(result, [16, 24, 28, 14])
+
+
+class TestWindows(unittest.TestCase):
+
+    values = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3]
+
+    def test_moving_average(self):
+        source = ListSource(self.values)
+
+        result = collect(source | MovingAverage(3, "i"))
+
+        self.assertEqual(result[:3], [3, 2, 8 / 3])
+        self.assertEqual(result[-1], 14 / 3)
+
+    def test_moving_average_rounding(self):
+        source = ListSource([0.1] * 200 + [0] * 4, delay=0)
+
+        result = collect(source | MovingAverage(4, "f"))
+
+        self.assertEqual(result[-1], 0)
+
+    def test_moving_min(self):
+        source = ListSource(self.values)
+
+        result = collect(source | MovingMin(3, "i"))
+
+        self.assertEqual(result, [3, 1, 1, 1, 1, 1, 2, 2, 2, 3])
+
+    def test_moving_max(self):
+        source = ListSource(self.values)
+
+        result = collect(source | MovingMax(3, "i"))
+
+        self.assertEqual(result, [3, 3, 4, 4, 5, 9, 9, 9, 6, 6])
+
+    def test_median(self):
+        source = ListSource([1, 2, 100, 3, 4, 5, 0, 6])
+
+        result = collect(source | Median(3, "i"))
+
+        self.assertEqual(result, [1, 1, 2, 3, 4, 4, 4, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,8 @@ import unittest
 import uasyncio
 import utime
 
-from ultimo.poll import Poll, apoll, poll
+from ultimo.core import ASink, asynchronize
+from ultimo.poll import BURST, SKIP, Poll, PollScheduler, apoll, poll
 
 
 class TestPoll(unittest.TestCase):
@@ -118,6 +119,155 @@ class TestPoll(unittest.TestCase):
         self.assertGreaterEqual(elapsed, 100)
 
 
+    def test_fixed_rate(self):
+        count = 10
+
+        async def decrement():
+            nonlocal count
+            await uasyncio.sleep(0.005)
+            value = count
+            count -= 1
+            if value < 0:
+                return None
+            else:
+                return value
+
+        source = Poll(decrement, 0.02, fixed_rate=True)
+        flow = source.__aiter__()
+
+        result = []
+
+        async def iterate():
+            async for value in flow:
+                result.append(value)
+
+        start = utime.ticks_ms()
+        uasyncio.run(iterate())
+        elapsed = utime.ticks_diff(utime.ticks_ms(), start)
+
+        self.assertEqual(result, [10, 9, 8, 7, 6, 5, 4, 3, 2, 1, 0])
+        # 12 polls at a fixed rate, rather than 12 * 25 ms
+        self.assertGreaterEqual(elapsed, 240)
+        self.assertLess(elapsed, 290)
+        self.assertEqual(flow.missed, 0)
+
+    def test_fixed_rate_skip(self):
+        delays = [0, 0.035, 0, 0]
+
+        async def slow():
+            if delays:
+                await uasyncio.sleep(delays.pop(0))
+                return True
+
+        flow = Poll(slow, 0.01, fixed_rate=True, catch_up=SKIP).__aiter__()
+
+        async def iterate():
+            async for value in flow:
+                pass
+
+        uasyncio.run(iterate())
+
+        self.assertGreaterEqual(flow.missed, 2)
+        self.assertGreaterEqual(flow.max_lateness, 0)
+
+    def test_fixed_rate_burst(self):
+        delays = [0, 0.035, 0, 0]
+
+        async def slow():
+            if delays:
+                await uasyncio.sleep(delays.pop(0))
+                return True
+
+        flow = Poll(slow, 0.01, fixed_rate=True, catch_up=BURST).__aiter__()
+
+        async def iterate():
+            async for value in flow:
+                pass
+
+        start = utime.ticks_ms()
+        uasyncio.run(iterate())
+        elapsed = utime.ticks_diff(utime.ticks_ms(), start)
+
+        self.assertEqual(flow.missed, 0)
+        self.assertLess(elapsed, 70)
+
+    def test_adaptive(self):
+        values = [1] * 6 + [2] + [2] * 3
+
+        async def next_value():
+            if values:
+                return values.pop(0)
+
+        flow = Poll(next_value, 0.001, max_interval=0.008).__aiter__()
+
+        intervals = []
+
+        async def iterate():
+            async for value in flow:
+                intervals.append(flow.interval)
+
+        uasyncio.run(iterate())
+
+        self.assertEqual(
+            intervals,
+            [0.001, 0.002, 0.004, 0.008, 0.008, 0.008, 0.001, 0.002, 0.004, 0.008],
+        )
+
+    def test_adaptive_fixed_rate(self):
+        with self.assertRaises(ValueError):
+            Poll(asynchronize(lambda: True), 0.001, fixed_rate=True, max_interval=0.1)
+
+
+class CountingSink(ASink):
+
+    def __init__(self, source=None):
+        super().__init__(source)
+        self.count = 0
+
+    async def process(self, value):
+        self.count += 1
+
+
+class TestPollScheduler(unittest.TestCase):
+
+    def test_scheduler(self):
+        @poll
+        def ticks():
+            return True
+
+        scheduler = PollScheduler()
+        fast_1 = ticks(0.01) | CountingSink()
+        fast_2 = ticks(0.01) | CountingSink()
+        slow = ticks(0.02) | CountingSink()
+        for sink in [fast_1, fast_2, slow]:
+            scheduler.add(sink)
+
+        async def main():
+            task = scheduler.create_task()
+            await uasyncio.sleep(0.105)
+            task.cancel()
+
+        uasyncio.run(main())
+
+        self.assertEqual(len(scheduler.groups), 2)
+        self.assertEqual(fast_1.count, fast_2.count)
+        self.assertIn(fast_1.count, [9, 10, 11])
+        self.assertIn(slow.count, [4, 5, 6])
+
+    def test_remove(self):
+        sink = Poll(asynchronize(lambda: True), 0.01) | CountingSink()
+        scheduler = PollScheduler()
+        scheduler.add(sink)
+        scheduler.remove(sink)
+
+        self.assertEqual(scheduler.groups, [])
+
+    def test_interval_required(self):
+        scheduler = PollScheduler()
+
+        with self.assertRaises(ValueError):
+            scheduler.add(CountingSink())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,392 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import io
+import sys
+import unittest
+import uasyncio
+
+from ultimo.core import ASource
+from ultimo.pipelines import BLOCK
+from ultimo.stream import (
+    DISCONNECT,
+    ABroadcastServer,
+    ABufferedWrite,
+    ARead,
+    AReadCOBS,
+    AReadInto,
+    AReadLengthPrefixed,
+    AReadSLIP,
+    AReadlineInto,
+    AWrite,
+)
+
+
+class FakeStream:
+    """Stand-in for an asyncio stream which returns data in fixed pieces."""
+
+    def __init__(self, pieces, empty=b""):
+        self.pieces = list(pieces)
+        self.empty = empty
+        self.reads = 0
+
+    async def read(self, size=-1):
+        self.reads += 1
+        await uasyncio.sleep(0)
+        if not self.pieces:
+            return self.empty
+        piece = self.pieces[0]
+        if size < 0 or size >= len(piece):
+            return self.pieces.pop(0)
+        self.pieces[0] = piece[size:]
+        return piece[:size]
+
+    async def readinto(self, buffer):
+        data = await self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class FakeWriter:
+    """Stand-in for an asyncio stream which records each write and drain."""
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.buffer = b""
+        self.writes = []
+        self.drained = []
+        self.draining = 0
+        self.max_draining = 0
+
+    def write(self, data):
+        self.writes.append(bytes(data))
+        self.buffer += data
+
+    async def drain(self):
+        self.draining += 1
+        self.max_draining = max(self.draining, self.max_draining)
+        await uasyncio.sleep(self.delay)
+        if self.buffer:
+            self.drained.append(self.buffer)
+        self.buffer = b""
+        self.draining -= 1
+
+
+class ListSource(ASource):
+
+    def __init__(self, values, delay=0):
+        self.values = list(values)
+        self.delay = delay
+
+    async def __call__(self):
+        await uasyncio.sleep(self.delay)
+        if self.values:
+            return self.values.pop(0)
+        else:
+            return None
+
+
+def collect(source):
+    result = []
+
+    async def iterate():
+        async for value in source:
+            result.append(bytes(value) if isinstance(value, memoryview) else value)
+
+    uasyncio.run(iterate())
+    return result
+
+
+class TestARead(unittest.TestCase):
+
+    def test_read(self):
+        reader = ARead(io.StringIO())
+        reader.stream = FakeStream(["hello"], "")
+
+        result = collect(reader)
+
+        self.assertEqual(result, ["h", "e", "l", "l", "o"])
+        self.assertEqual(reader.stream.reads, 6)
+
+    def test_chunked(self):
+        reader = ARead(io.BytesIO(), chunk_size=4)
+        reader.stream = FakeStream([b"hello", b"!"])
+
+        result = collect(reader)
+
+        self.assertEqual(result, [b"h", b"e", b"l", b"l", b"o", b"!"])
+        self.assertEqual(reader.stream.reads, 4)
+
+    def test_chunk_stdin(self):
+        with self.assertRaises(ValueError):
+            ARead(sys.stdin, chunk_size=4)
+
+
+class TestAReadInto(unittest.TestCase):
+
+    def test_read_into(self):
+        reader = AReadInto(io.BytesIO(), 4)
+        reader.stream = FakeStream([b"hello", b"!"])
+
+        result = collect(reader)
+
+        self.assertEqual(result, [b"hell", b"o", b"!"])
+
+
+class TestAReadlineInto(unittest.TestCase):
+
+    def test_lines(self):
+        reader = AReadlineInto(io.BytesIO(), 16, chunk_size=4)
+        reader.stream = FakeStream([b"$GPGGA\n$GP", b"RMC\n\nend"])
+
+        result = collect(reader)
+
+        self.assertEqual(result, [b"$GPGGA\n", b"$GPRMC\n", b"\n", b"end"])
+
+    def test_truncate(self):
+        reader = AReadlineInto(io.BytesIO(), 4, chunk_size=3)
+        reader.stream = FakeStream([b"ok\ntoo long\nok\n"])
+
+        result = collect(reader)
+
+        self.assertEqual(result, [b"ok\n", b"too ", b"ok\n"])
+        self.assertEqual(reader.truncated, 1)
+
+    def test_skip(self):
+        reader = AReadlineInto(io.BytesIO(), 4, truncate=False)
+        reader.stream = FakeStream([b"ok\ntoo long\nok\ntoo long"])
+
+        result = collect(reader)
+
+        self.assertEqual(result, [b"ok\n", b"ok\n"])
+        self.assertEqual(reader.errors, 2)
+
+
+class TestAReadFrames(unittest.TestCase):
+
+    def test_length_prefixed(self):
+        reader = AReadLengthPrefixed(io.BytesIO(), 4, chunk_size=3)
+        reader.stream = FakeStream([b"\x02ab\x00\x07toolong\x03xyz"])
+
+        result = collect(reader)
+
+        self.assertEqual(result, [b"ab", b"", b"xyz"])
+        self.assertEqual(reader.errors, 1)
+
+    def test_length_prefixed_header(self):
+        reader = AReadLengthPrefixed(io.BytesIO(), header=">H")
+        reader.stream = FakeStream([b"\x00\x03abc\x00", b"\x01d"])
+
+        result = collect(reader)
+
+        self.assertEqual(result, [b"abc", b"d"])
+
+    def test_cobs(self):
+        reader = AReadCOBS(io.BytesIO(), chunk_size=4)
+        reader.stream = FakeStream([
+            b"\x03\x11\x22\x02\x33\x00",
+            b"\x01\x01\x00\x01\x00",
+        ])
+
+        result = collect(reader)
+
+        self.assertEqual(result, [b"\x11\x22\x00\x33", b"\x00", b""])
+
+    def test_cobs_resync(self):
+        reader = AReadCOBS(io.BytesIO(), 2)
+        reader.stream = FakeStream([
+            b"\x05\x11\x00",
+            b"\x04\x11\x22\x33\x00",
+            b"\x02\x44\x00",
+        ])
+
+        result = collect(reader)
+
+        self.assertEqual(result, [b"\x44"])
+        self.assertEqual(reader.errors, 2)
+
+    def test_slip(self):
+        reader = AReadSLIP(io.BytesIO(), chunk_size=4)
+        reader.stream = FakeStream([
+            b"\xc0ab\xdb\xdcc\xc0\xc0",
+            b"\xdb\xddd\xc0\xdb\x01\xc0e\xc0",
+        ])
+
+        result = collect(reader)
+
+        self.assertEqual(result, [b"ab\xc0c", b"\xdbd", b"e"])
+        self.assertEqual(reader.errors, 1)
+
+
+class TestAWrite(unittest.TestCase):
+
+    def test_write(self):
+        writer = AWrite(io.BytesIO(), ListSource([b"a", b"b", b"c"]))
+        writer.stream = FakeWriter()
+
+        uasyncio.run(writer.run())
+
+        self.assertEqual(writer.stream.drained, [b"a", b"b", b"c"])
+
+    def test_coalesce(self):
+        writer = ABufferedWrite(io.BytesIO(), source=ListSource([b"a", b"b", b"c"]))
+        writer.stream = FakeWriter()
+
+        async def main():
+            await writer(b"x")
+            await writer(b"y")
+            await uasyncio.sleep(0.01)
+            await writer.run()
+
+        uasyncio.run(main())
+
+        self.assertEqual(writer.stream.writes[0], b"xy")
+        self.assertEqual(writer.stream.drained[0], b"xy")
+        self.assertEqual(b"".join(writer.stream.drained), b"xyabc")
+        self.assertEqual(len(writer.stream.writes), len(writer.stream.drained))
+
+    def test_threshold(self):
+        writer = ABufferedWrite(io.BytesIO(), latency=1, threshold=4)
+        writer.stream = FakeWriter()
+
+        async def main():
+            for value in [b"ab", b"cd", b"ef"]:
+                await writer(value)
+            drained = list(writer.stream.drained)
+            await writer.flush()
+            return drained
+
+        drained = uasyncio.run(main())
+
+        self.assertEqual(drained, [b"abcd"])
+        self.assertEqual(writer.stream.writes, [b"abcd", b"ef"])
+        self.assertEqual(writer.stream.drained, [b"abcd", b"ef"])
+        self.assertIsNone(writer.flush_task)
+
+    def test_single_drain(self):
+        writer = ABufferedWrite(io.BytesIO(), threshold=4)
+        writer.stream = FakeWriter(0.02)
+
+        async def main():
+            await writer(b"ab")
+            # let the delayed flush start draining
+            await uasyncio.sleep(0.01)
+            await writer(b"cd")
+            await writer(b"ef")
+            await writer.flush()
+
+        uasyncio.run(main())
+
+        self.assertEqual(writer.stream.max_draining, 1)
+        self.assertEqual(b"".join(writer.stream.drained), b"abcdef")
+
+    def test_text(self):
+        writer = ABufferedWrite(io.StringIO(), threshold=8)
+        writer.stream = FakeWriter()
+
+        async def main():
+            await writer("h\u00e9")
+            self.assertEqual(writer.pending, 3)
+            await writer.flush()
+
+        uasyncio.run(main())
+
+        self.assertEqual(writer.stream.writes, [b"h\xc3\xa9"])
+
+    def test_oversized(self):
+        writer = ABufferedWrite(io.BytesIO(), latency=1, threshold=4)
+        writer.stream = FakeWriter()
+
+        async def main():
+            await writer(b"ab")
+            await writer(b"cdefgh")
+            await writer(b"ij")
+            await writer.flush()
+
+        uasyncio.run(main())
+
+        self.assertEqual(writer.stream.writes, [b"ab", b"cdefgh", b"ij"])
+
+
+PORT = 18765
+
+
+async def wait_for_clients(server, count):
+    for i in range(100):
+        if len(server.clients) >= count:
+            return
+        await uasyncio.sleep(0.01)
+
+
+class TestABroadcastServer(unittest.TestCase):
+
+    def test_blocking_policy(self):
+        with self.assertRaises(ValueError):
+            ABroadcastServer("127.0.0.1", PORT, policy=BLOCK)
+
+    def test_broadcast(self):
+
+        async def main():
+            server = ABroadcastServer("127.0.0.1", PORT)
+            async with server:
+                first = await uasyncio.open_connection("127.0.0.1", PORT)
+                second = await uasyncio.open_connection("127.0.0.1", PORT)
+                await wait_for_clients(server, 2)
+                await server(b"hello\n")
+                await server("world\n")
+                result = []
+                for reader, writer in [first, second]:
+                    result.append(await reader.readline())
+                    result.append(await reader.readline())
+                    writer.close()
+            return result
+
+        result = uasyncio.run(main())
+
+        self.assertEqual(result, [b"hello\n", b"world\n"] * 2)
+
+    def test_disconnect(self):
+
+        async def main():
+            server = ABroadcastServer("127.0.0.1", PORT + 1, 2, DISCONNECT)
+            async with server:
+                reader, writer = await uasyncio.open_connection("127.0.0.1", PORT + 1)
+                await wait_for_clients(server, 1)
+                # values are queued without yielding, so the queue overflows
+                for value in [b"a", b"b", b"c"]:
+                    await server(value)
+                clients = len(server.clients)
+                data = await reader.read(10)
+                writer.close()
+            return clients, data, server.disconnects
+
+        clients, data, disconnects = uasyncio.run(main())
+
+        self.assertEqual(clients, 0)
+        self.assertEqual(data, b"")
+        self.assertEqual(disconnects, 1)
+
+    def test_numbers(self):
+
+        async def main():
+            server = ABroadcastServer("127.0.0.1", PORT + 2)
+            async with server:
+                reader, writer = await uasyncio.open_connection("127.0.0.1", PORT + 2)
+                await wait_for_clients(server, 1)
+                await server(40000)
+                await server(1.5)
+                await server(bytearray(b"ab\n"))
+                result = []
+                for i in range(3):
+                    result.append(await reader.readline())
+                writer.close()
+            return result
+
+        result = uasyncio.run(main())
+
+        self.assertEqual(result, [b"40000\n", b"1.5\n", b"ab\n"])
+
+
+if __name__ == "__main__":
+    unittest.main()